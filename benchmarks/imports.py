@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: imports.py
+
+"""
+Times "import footylib" in fresh interpreters and checks it against a budget
+
+Every run starts a new interpreter, so nothing is already imported. The
+heavy dependencies (requests, icalendar, dateparser, bs4, numpy, aiohttp)
+must only be imported on first use. The script exits with status 1 when
+one of them is imported by "import footylib" or when the median import
+time is over the budget, so it can gate a CI job.
+
+Usage: python benchmarks/imports.py [--repeat 10] [--budget 0.15]
+                                    [--output results.json]
+"""
+
+import os
+import sys
+import json
+import argparse
+import platform
+import subprocess
+from statistics import median
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+HEAVY = ('requests', 'icalendar', 'dateparser', 'bs4', 'numpy', 'aiohttp')
+PROBE = '''
+import sys, json, time
+start = time.perf_counter()
+import footylib
+footylib.Footy()
+elapsed = time.perf_counter() - start
+print(json.dumps({'seconds': elapsed,
+                  'loaded': [name for name in %r if name in sys.modules]}))
+''' % (HEAVY,)
+
+
+def run_once():
+    """
+    :return: dictionary with the seconds the import took and the heavy
+             modules it loaded
+    """
+    output = subprocess.check_output([sys.executable, '-c', PROBE],
+                                      cwd=ROOT)
+    return json.loads(output.decode('utf-8'))
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--budget', type=float, default=0.15,
+                        help='seconds the median import may take')
+    parser.add_argument('--output', help='file to write, stdout if omitted')
+    args = parser.parse_args(arguments)
+
+    runs = [run_once() for _ in range(args.repeat)]
+    seconds = [run['seconds'] for run in runs]
+    loaded = sorted(set(name for run in runs for name in run['loaded']))
+    results = {
+        'python': platform.python_version(),
+        'repeat': args.repeat,
+        'budget': args.budget,
+        'median': median(seconds),
+        'min': min(seconds),
+        'max': max(seconds),
+        'heavy_modules_loaded': loaded,
+        'passed': median(seconds) <= args.budget and not loaded,
+    }
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+    else:
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+    return 0 if results['passed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
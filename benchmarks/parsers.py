@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: parsers.py
+
+"""
+Compares parse time and peak memory of the parser backends
+
+Usage: python benchmarks/parsers.py [competition.html ...]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from footylib.footylib import Competition  # noqa: E402
+from footylib.footylibParsers import BACKENDS, get_backend  # noqa: E402
+from footylib.footylibExceptions import UnknownParserBackend  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+REPEAT = 50
+
+
+def measure(backend, html):
+    """
+    :param backend: backend object
+    :param html: competition page
+    :return: tuple of mean seconds per parse and peak bytes of one parse
+    """
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        backend.sections(html, Competition.SECTIONS)
+    elapsed = (time.perf_counter() - start) / REPEAT
+    tracemalloc.start()
+    backend.sections(html, Competition.SECTIONS)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(paths):
+    paths = paths or [os.path.join(FIXTURES, 'competition.html')]
+    for path in paths:
+        with open(path) as page:
+            html = page.read()
+        print('{} ({} bytes)'.format(path, len(html)))
+        for name in sorted(BACKENDS):
+            try:
+                backend = get_backend(name)
+            except UnknownParserBackend as error:
+                print('  {:<12} skipped: {}'.format(name, error))
+                continue
+            elapsed, peak = measure(backend, html)
+            print('  {:<12} {:8.2f} ms {:10.1f} KiB peak'.format(
+                name, elapsed * 1000, peak / 1024.0))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
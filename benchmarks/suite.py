@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: suite.py
+
+"""
+Times every phase of a Footy crawl over the recorded fixtures
+
+The front page and competition page in fixtures/ are served by a local
+stand-in for the requests Session, so no request reaches footy.eu.
+Results are written as JSON so they can be compared between commits.
+
+The crawl phase is a full Footy.prefetch, with --processes the pages
+are parsed in that many processes.
+
+Usage: python benchmarks/suite.py [--repeat 5] [--parser strained]
+                                  [--processes 4] [--output results.json]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+from statistics import median
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import footylib  # noqa: E402
+from footylib import footylib as core  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+PHASES = ('fetch', 'parse', 'dates', 'rows', 'events', 'ics', 'crawl')
+
+
+class FixtureResponse(object):
+    """
+    Minimal stand-in for a requests Response
+    """
+
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.content = text.encode('utf-8')
+        self.status_code = status_code
+        self.headers = {}
+
+
+class FixtureSession(object):
+    """
+    Stand-in for a requests Session that serves the recorded pages
+
+    The front page is served for the Footy site and the competition page
+    for any other url. Every requested url is recorded in calls.
+    """
+
+    def __init__(self, site, front_page=None, competition_page=None):
+        self.site = site
+        self.front_page = front_page or read_fixture('front.html')
+        self.competition_page = (competition_page or
+                                 read_fixture('competition.html'))
+        self.headers = {}
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append(url)
+        if url == self.site:
+            return FixtureResponse(self.front_page)
+        return FixtureResponse(self.competition_page)
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name)) as fixture:
+        return fixture.read()
+
+
+def fixture_footy(**kwargs):
+    """
+    :return: Footy object that crawls the fixtures
+    """
+    # No throttling, the suite measures parsing and caching, not sleep
+    kwargs.setdefault('transport', footylib.Transport(rate=None))
+    footy = footylib.Footy(**kwargs)
+    footy._session = FixtureSession(footy._site)
+    return footy
+
+
+def run_once(parser, processes=None):
+    """
+    Crawls the fixtures once, timing every phase separately
+
+    :param parser: name of the parser backend
+    :param processes: number of parsing processes for the crawl phase
+    :return: dictionary of phase to seconds and a dictionary of counts
+    """
+    timings = {}
+    footy = fixture_footy(parser=parser)
+
+    start = time.perf_counter()
+    front_page = footy._front_page = footy._fetch(footy._site)
+    urls = set(url for url in footy._parser.competition_urls(front_page)
+               if '#' not in url)
+    pages = {url: footy._fetch(url) for url in urls}
+    timings['fetch'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    competitions = footy.competitions
+    for competition in competitions:
+        competition._sections = footy._parser.sections(
+            pages[competition.url], competition.SECTIONS)
+    timings['parse'] = time.perf_counter() - start
+
+    kickoffs = [row[0] for competition in competitions
+                for row in competition._get_table('previous-matches').rows]
+    core._strptime.cache_clear()
+    start = time.perf_counter()
+    for kickoff in kickoffs:
+        core.Match._Match__string_to_datetime(kickoff)
+    timings['dates'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for competition in competitions:
+        competition._load()
+    timings['rows'] = time.perf_counter() - start
+
+    matches = [match for competition in competitions
+               for match in competition.matches]
+    start = time.perf_counter()
+    for match in matches:
+        _ = match.event
+    timings['events'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    size = sum(len(competition.calendar.to_ical())
+               for competition in competitions)
+    timings['ics'] = time.perf_counter() - start
+
+    crawler = fixture_footy(parser=parser, processes=processes)
+    start = time.perf_counter()
+    crawler.prefetch()
+    timings['crawl'] = time.perf_counter() - start
+
+    counts = {'pages': len(pages) + 1,
+              'competitions': len(competitions),
+              'teams': sum(len(competition.teams)
+                           for competition in competitions),
+              'matches': len(matches),
+              'ics_bytes': size}
+    return timings, counts
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--parser', default='strained')
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--output', help='file to write, stdout if omitted')
+    args = parser.parse_args(arguments)
+
+    runs = [run_once(args.parser, args.processes)
+            for _ in range(args.repeat)]
+    results = {
+        'footylib': footylib.__version__.strip(),
+        'python': platform.python_version(),
+        'parser': args.parser,
+        'processes': args.processes,
+        'repeat': args.repeat,
+        'counts': runs[0][1],
+        'phases': {phase: {'median': median(run[0][phase] for run in runs),
+                           'min': min(run[0][phase] for run in runs)}
+                   for phase in PHASES},
+    }
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+    else:
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,15 @@
 
 from ._version import __version__
 from .footylib import Footy, FootyEvent
+from .footylibAsync import AsyncFooty
+from .footylibCache import ResponseCache, MemoryCache, FileCache
+from .footylibIndex import TeamIndex, MatchIndex
+from .footylibTransport import Transport
+from .footylibMetrics import METRICS, Metrics
+from .footylibCalendar import CalendarCache
+from .footylibStandings import StandingsEngine
+from .footylibArchive import Archive
+from .footylibScheduler import Scheduler
 from .footylibExceptions import *
 
 __author__ = 'Oriol Fabregas'
@@ -9,3 +18,16 @@ __author__ = 'Oriol Fabregas'
 assert __version__
 assert Footy
 assert FootyEvent
+assert ResponseCache
+assert MemoryCache
+assert FileCache
+assert TeamIndex
+assert MatchIndex
+assert CalendarCache
+assert AsyncFooty
+assert Transport
+assert METRICS
+assert Metrics
+assert StandingsEngine
+assert Archive
+assert Scheduler
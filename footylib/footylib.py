@@ -4,13 +4,25 @@
 
 """footylib"""
 
+import asyncio
 import logging
-from requests import Session
-from dateparser import parse
-from bs4 import BeautifulSoup as Bfs
-from datetime import timedelta
-from icalendar import Calendar, Event, vText
-from collections import namedtuple
+import threading
+from concurrent.futures import (ThreadPoolExecutor, as_completed, wait,
+                                FIRST_COMPLETED)
+from datetime import datetime, timedelta
+from functools import lru_cache
+from collections import namedtuple, Counter, defaultdict
+from .footylibCache import CacheEntry
+from .footylibIndex import TeamIndex, MatchIndex, normalize
+from .footylibTransport import Transport
+from .footylibMetrics import METRICS
+from .footylibParsers import Section, get_backend
+from .footylibStandings import StandingsEngine
+from . import footylibSnapshot
+from . import footylibCalendar
+from . import footylibColumns
+from .footylibArchive import Archive
+from .footylibExceptions import BlockingFetchOnEventLoop
 
 
 LOGGER_BASENAME = '''footylib'''
@@ -18,6 +30,122 @@ LOGGER = logging.getLogger(LOGGER_BASENAME)
 LOGGER.setLevel(logging.DEBUG)
 LOGGER.addHandler(logging.NullHandler())
 
+DATETIME_FORMAT = '%d.%m.%Y %H:%M'
+DATEPARSER_SETTINGS = {'TIMEZONE': 'Europe/Amsterdam'}
+
+# Default for kickoffs that still have to be parsed from the row
+NOT_PARSED = object()
+
+# How often kickoffs went through dateparser ('fallback') and how often
+# even that could not make sense of them ('failed')
+DATETIME_STATS = Counter()
+
+
+@lru_cache(maxsize=4096)
+def _strptime(datetime_string):
+    """
+    Parses a kickoff in the fixed Footy layout, memoizing repeated ones
+
+    :param datetime_string: 05.09.2017 21:30
+    :return: naive datetime object
+    """
+    return datetime.strptime(datetime_string.strip(), DATETIME_FORMAT)
+
+
+def _string_to_datetime(datetime_string):
+    """
+    Parses a kickoff, falling back to dateparser for unknown layouts
+
+    :param datetime_string: 05.09.2017 21:30
+    :return: datetime object or None
+    """
+    try:
+        return _strptime(datetime_string)
+    except (TypeError, ValueError):
+        DATETIME_STATS['fallback'] += 1
+        METRICS.count('footylib_kickoff_fallbacks_total')
+    # dateparser loads its language data on import, only pay for it
+    # when a kickoff does not fit the Footy layout
+    from dateparser import parse
+    datetime_object = None
+    try:
+        datetime_object = parse(date_string=datetime_string,
+                                date_formats=[DATETIME_FORMAT],
+                                settings=DATEPARSER_SETTINGS)
+    except AttributeError:
+        LOGGER.exception("Couldn't parse this datetime.")
+    if datetime_object is None:
+        DATETIME_STATS['failed'] += 1
+        METRICS.count('footylib_kickoff_failures_total')
+    return datetime_object
+
+
+def _calendar():
+    """
+    :return: empty icalendar Calendar, icalendar is imported on first use
+    """
+    from icalendar import Calendar
+    return Calendar()
+
+
+def _on_event_loop():
+    """
+    :return: True when called from a thread running an asyncio event loop
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def _split_score(score):
+    """
+    :param score: -:- before the match, 0 - 0 once it is played
+    :return: tuple of home and visiting goals as strings
+    """
+    try:
+        # Match not started (-:-)
+        home, visiting = score.split(':')
+    except ValueError:
+        # Played match (0 - 0)
+        home, visiting = score.split('-')
+    return home.strip(), visiting.strip()
+
+
+def _parse_page(parser, page, section_ids):
+    """
+    Parses a competition page, run in the worker processes
+
+    Only plain rows and datetimes are returned, so the result is cheap
+    to pickle back to the parent. So are the kickoff fallbacks counted
+    while parsing, the DATETIME_STATS of a worker are not the parent's.
+    :param parser: parser backend object
+    :param page: competition page HTML
+    :param section_ids: ids of the sections to extract
+    :return: tuple of the sections, the parsed kickoff of every match and
+             a Counter of the kickoff fallbacks
+    """
+    before = Counter(DATETIME_STATS)
+    sections = parser.sections(page, section_ids)
+    matches = sections.get('previous-matches')
+    kickoffs = [_string_to_datetime(row[0]) if row else None
+                for row in (matches.rows if matches else [])]
+    return sections, kickoffs, DATETIME_STATS - before
+
+
+def _merge_datetime_stats(stats):
+    """
+    Adds the kickoff fallbacks counted in a worker process
+
+    :param stats: Counter returned by _parse_page
+    """
+    DATETIME_STATS.update(stats)
+    if stats['fallback']:
+        METRICS.count('footylib_kickoff_fallbacks_total', stats['fallback'])
+    if stats['failed']:
+        METRICS.count('footylib_kickoff_failures_total', stats['failed'])
+
 
 class Footy(object):
     """
@@ -27,30 +155,97 @@ class Footy(object):
     or get a team directly.
     """
 
-    def __init__(self):
+    def __init__(self, prefetch=False, max_workers=8, max_per_host=4,
+                 cache=None, parser='strained', calendar_cache=None,
+                 transport=None, processes=None):
+        """
+        :param prefetch: fetch and parse all competition pages concurrently
+                         as soon as the competitions are discovered
+        :param max_workers: number of threads used when prefetching
+        :param max_per_host: maximum concurrent requests against one host
+        :param cache: ResponseCache object to keep pages between instances
+        :param parser: name of a parser backend, see footylibParsers.BACKENDS
+        :param calendar_cache: CalendarCache object, defaults to the one
+                               shared by all Footy objects
+        :param transport: Transport object, overrides max_per_host
+        :param processes: number of processes parsing the pages when
+                          prefetching, None parses them in the threads
+        """
         self.logger = logging.getLogger('{base}.{suffix}'.format(
             base=LOGGER_BASENAME, suffix=self.__class__.__name__))
         self._site = 'https://www.footy.eu/schemas-standen/'
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        self._session = Session()
-        self._session.headers.update(headers)
+        self.transport = transport or Transport(
+            pool_maxsize=max(max_workers, 10), max_per_host=max_per_host)
         self._front_page = None
         self._competitions = []
         self._urls = set()
+        self._prefetch = prefetch
+        self._max_workers = max_workers
+        self._processes = processes
+        self._cache = cache
+        self._team_index = None
+        self._match_index = None
+        # Set by AsyncFooty, blocking fetches are refused on its event loop
+        self._async = False
+        # Guards the league page, the competitions and the indexes so
+        # concurrent callers share a single fetch
+        self._lock = threading.RLock()
+        self._parser = get_backend(parser)
+        self.calendar_cache = (calendar_cache or
+                               footylibCalendar.CALENDAR_CACHE)
+
+    @property
+    def _session(self):
+        return self.transport.session
+
+    @_session.setter
+    def _session(self, session):
+        self.transport.session = session
+
+    def _fetch(self, url, revalidate=False):
+        """
+        Gets a page through the shared session
+
+        When a cache is set, fresh entries are served without a request
+        and stale ones are revalidated with a conditional request.
+        :param url: url to retrieve
+        :param revalidate: always revalidate cached entries, even fresh ones
+        :return: page body as string
+        """
+        if self._async and _on_event_loop():
+            raise BlockingFetchOnEventLoop(url)
+        page = 'league' if url == self._site else 'competition'
+        entry = self._cache.get(url) if self._cache else None
+        if entry and not revalidate and self._cache.is_fresh(entry):
+            METRICS.count('footylib_cache_requests_total', result='fresh')
+            return entry.body
+        headers = entry.conditional_headers if entry else {}
+        with METRICS.timer('footylib_fetch_seconds', page=page):
+            response = self.transport.get(url, headers=headers)
+        METRICS.count('footylib_fetch_bytes_total', len(response.content),
+                      page=page)
+        if entry and response.status_code == 304:
+            METRICS.count('footylib_cache_requests_total',
+                          result='not_modified')
+            self._cache.set(url, entry.touch())
+            return entry.body
+        if self._cache:
+            METRICS.count('footylib_cache_requests_total', result='miss')
+            if response.status_code == 200:
+                self._cache.set(url, CacheEntry.from_response(response))
+        return response.text
 
     @property
     def __league_page(self):
         """
-        Gets Footy.eu competitions page and scrapes its HTML
+        Gets Footy.eu competitions page
 
-        :return: footy front page as BFS object
+        :return: footy front page HTML
         """
         if not self._front_page:
-            page = self._session.get(self._site)
-            try:
-                self._front_page = Bfs(page.text, 'html.parser')
-            except Bfs.HTMLParser.HTMLParseError:
-                self.logger.exception("Error while parsing Footy front page")
+            with self._lock:
+                if not self._front_page:
+                    self._front_page = self._fetch(self._site)
         return self._front_page
 
     @property
@@ -61,31 +256,429 @@ class Footy(object):
         :return: list of Competition objects
         """
         if not self._competitions:
-            league_page = self.__league_page.find('div',
-                                                  {'id': 'league-page'})
-            competitions = league_page.find_all('ul', {'class': 'sub-menu'})
-            for competition in competitions:
-                for competition_url in competition.find_all({'a': 'href'}):
-                    url = competition_url.attrs.get('href')
-                    if url not in self._urls and '#' not in url:
-                        self._competitions.append(Competition(self, url))
-                    self._urls.add(url)
+            self._get_competitions()
+            if self._prefetch:
+                self.prefetch()
+        return self._competitions
+
+    def _get_competitions(self):
+        """
+        Scrapes the competition URLs from the league page
+
+        The list is built aside and assigned at once, so other threads
+        either see no competitions or all of them.
+        :return: list of Competition objects
+        """
+        if not self._competitions:
+            with self._lock:
+                if not self._competitions:
+                    competitions = []
+                    urls = self._parser.competition_urls(self.__league_page)
+                    for url in urls:
+                        if url not in self._urls and '#' not in url:
+                            competitions.append(Competition(self, url))
+                        self._urls.add(url)
+                    self._competitions = competitions
         return self._competitions
 
+    def prefetch(self, max_workers=None, processes=None):
+        """
+        Fetches and parses every competition page concurrently.
+
+        All workers share the same session and the requests per host
+        are capped, so a full crawl takes about as long as the slowest
+        competition page. With processes the pages are parsed in a
+        process pool as they come in, so parsing scales with the cores.
+        :param max_workers: number of threads, defaults to the one on init
+        :param processes: number of parsing processes, defaults to the
+                          one on init
+        :return: list of Competition objects
+        """
+        competitions = self._get_competitions()
+        workers = max_workers or self._max_workers
+        processes = processes or self._processes
+        if processes:
+            return self._prefetch_processes(competitions, workers, processes)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(competition._load): competition
+                       for competition in competitions}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception:
+                    self.logger.exception("Error while prefetching {}".format(
+                        futures[future].url))
+        return competitions
+
+    def _prefetch_processes(self, competitions, workers, processes):
+        """
+        Fetches the pages in threads and parses them in processes
+
+        :param competitions: list of Competition objects
+        :param workers: number of fetching threads
+        :param processes: number of parsing processes
+        :return: list of Competition objects
+        """
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        pending = [competition for competition in competitions
+                   if competition._sections is None]
+        # The workers are started while the fetching threads run, and
+        # forking a process with running threads is not safe
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context(
+            'forkserver' if 'forkserver' in methods else 'spawn')
+        with ThreadPoolExecutor(max_workers=workers) as executor, \
+                ProcessPoolExecutor(max_workers=processes,
+                                    mp_context=context) as pool:
+            fetches = {executor.submit(competition._fetch_unloaded):
+                       competition for competition in pending}
+            parses = {}
+            for future in as_completed(fetches):
+                competition = fetches[future]
+                try:
+                    page = future.result()
+                except Exception:
+                    self.logger.exception("Error while prefetching {}".format(
+                        competition.url))
+                    continue
+                if page is None:
+                    continue
+                parses[pool.submit(_parse_page, self._parser, page,
+                                   competition.SECTIONS)] = competition
+            for future in as_completed(parses):
+                competition = parses[future]
+                try:
+                    sections, kickoffs, stats = future.result()
+                    _merge_datetime_stats(stats)
+                    competition._assemble(sections, kickoffs)
+                except Exception:
+                    self.logger.exception("Error while parsing {}".format(
+                        competition.url))
+        for competition in competitions:
+            if competition._sections is not None:
+                competition._load()
+        return competitions
+
+    def _iter_loaded(self, load, concurrent=False, max_workers=None):
+        """
+        Loads competitions one by one and yields each as soon as it is done
+
+        Concurrent loading keeps at most max_workers pages in flight, and
+        pages that were not requested yet are dropped when the caller
+        stops iterating.
+        :param load: function taking a Competition, run in the workers
+        :param concurrent: load concurrently and yield in completion order
+        :param max_workers: number of threads, defaults to the one on init
+        :return: generator of (Competition, load result)
+        """
+        competitions = iter(self._get_competitions())
+        if not concurrent:
+            for competition in competitions:
+                try:
+                    result = load(competition)
+                except Exception:
+                    self.logger.exception("Error while loading {}".format(
+                        competition.url))
+                    continue
+                yield competition, result
+            return
+        workers = max_workers or self._max_workers
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            pending = {}
+            for competition in competitions:
+                pending[executor.submit(load, competition)] = competition
+                if len(pending) == workers:
+                    break
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    competition = pending.pop(future)
+                    for next_competition in competitions:
+                        pending[executor.submit(load, next_competition)] = \
+                            next_competition
+                        break
+                    try:
+                        result = future.result()
+                    except Exception:
+                        self.logger.exception(
+                            "Error while loading {}".format(competition.url))
+                        continue
+                    yield competition, result
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def iter_competitions(self, concurrent=False, max_workers=None):
+        """
+        Yields every competition as soon as its page is fetched and parsed
+
+        :param concurrent: load concurrently and yield in completion order
+        :param max_workers: number of threads, defaults to the one on init
+        :return: generator of Competition objects
+        """
+        for competition, _ in self._iter_loaded(Competition._load,
+                                                concurrent, max_workers):
+            yield competition
+
+    def iter_teams(self, concurrent=False, max_workers=None):
+        """
+        Yields the teams of every competition as soon as its page is parsed
+
+        :param concurrent: load concurrently, competitions in completion order
+        :param max_workers: number of threads, defaults to the one on init
+        :return: generator of Team objects
+        """
+        for _, teams in self._iter_loaded(lambda competition:
+                                          competition.teams,
+                                          concurrent, max_workers):
+            for team in teams:
+                yield team
+
+    def iter_matches(self, concurrent=False, max_workers=None):
+        """
+        Yields the matches of every competition as soon as its page is parsed
+
+        :param concurrent: load concurrently, competitions in completion order
+        :param max_workers: number of threads, defaults to the one on init
+        :return: generator of Match objects
+        """
+        for _, matches in self._iter_loaded(lambda competition:
+                                            competition.matches,
+                                            concurrent, max_workers):
+            for match in matches:
+                yield match
+
+    def iter_search_team(self, team_name, concurrent=False, max_workers=None):
+        """
+        Looks for a team competition by competition, without waiting for
+        the whole site like search_team does.
+
+        :param team_name: string of team name to look for.
+        :param concurrent: load concurrently, competitions in completion order
+        :param max_workers: number of threads, defaults to the one on init
+        :return: generator of Team object(s)
+        """
+        key = normalize(team_name)
+        for team in self.iter_teams(concurrent, max_workers):
+            if key in normalize(team.name):
+                yield team
+
+    def refresh(self, max_workers=None):
+        """
+        Fetches the league and competition pages again and updates the
+        existing objects in place.
+
+        Competitions that appeared on the league page are added and fully
+        loaded, the ones that disappeared are dropped.
+        :param max_workers: number of threads, defaults to the one on init
+        :return: list of Changes objects for the competitions that changed
+        """
+        with self._lock:
+            self._front_page = self._fetch(self._site, revalidate=True)
+            urls = [url for url in
+                    self._parser.competition_urls(self._front_page)
+                    if '#' not in url]
+            current = set(urls)
+            competitions = []
+            for competition in self._competitions:
+                if competition.url in current:
+                    competitions.append(competition)
+                    continue
+                self._urls.discard(competition.url)
+                self._unindex(competition.url)
+            for url in urls:
+                if url not in self._urls:
+                    competitions.append(Competition(self, url))
+                self._urls.add(url)
+            self._competitions = competitions
+        changes = []
+        workers = max_workers or self._max_workers
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(competition.refresh): competition
+                       for competition in self._competitions}
+            for future in as_completed(futures):
+                try:
+                    competition_changes = future.result()
+                except Exception:
+                    self.logger.exception("Error while refreshing {}".format(
+                        futures[future].url))
+                    continue
+                if competition_changes:
+                    changes.append(competition_changes)
+        order = {competition.url: position for position, competition
+                 in enumerate(self._competitions)}
+        return sorted(changes,
+                      key=lambda change: order[change.competition.url])
+
+    def export_calendars(self, directory):
+        """
+        Writes one .ics per competition and one per team
+
+        Every match is serialized once and written to the calendars of
+        its competition and of both its teams.
+        :param directory: directory to write the calendars to
+        :return: list of written paths
+        """
+        return footylibCalendar.export_calendars(self.competitions, directory)
+
+    def save_snapshot(self, path):
+        """
+        Stores all competitions, teams and matches in a SQLite file
+
+        Competitions that are not loaded yet are fetched first.
+        :param path: path of the snapshot file
+        """
+        footylibSnapshot.save(self, path)
+
+    @classmethod
+    def load_snapshot(cls, path, **kwargs):
+        """
+        Creates a Footy object from a snapshot without any request
+
+        :param path: path of the snapshot file
+        :param kwargs: arguments for the Footy object
+        :return: Footy object
+        """
+        footy = cls(**kwargs)
+        footylibSnapshot.load(footy, path)
+        return footy
+
+    def archive(self, directory, season=None):
+        """
+        Appends the current state of all competitions to a season archive
+
+        :param directory: directory of the archive
+        :param season: season name, taken from the kickoffs when omitted
+        :return: number of records written
+        """
+        return Archive(directory).append(self.competitions, season)
+
+    def to_columns(self):
+        """
+        Typed NumPy columns of the teams and matches of all competitions
+
+        :return: dictionary with 'teams' and 'matches', each a dictionary
+                 of column name to array
+        """
+        return footylibColumns.to_columns(self.competitions)
+
+    def write_csv(self, stream, table='matches'):
+        """
+        Streams the teams or matches of all competitions as CSV
+
+        :param stream: text file opened with newline=''
+        :param table: 'teams' or 'matches'
+        :return: number of records written
+        """
+        return footylibColumns.write_csv(self.competitions, stream, table)
+
+    def write_jsonl(self, stream, table='matches'):
+        """
+        Streams the teams or matches of all competitions as JSON Lines
+
+        :param stream: text file
+        :param table: 'teams' or 'matches'
+        :return: number of records written
+        """
+        return footylibColumns.write_jsonl(self.competitions, stream, table)
+
+    def standings(self, points_win=3, points_draw=1):
+        """
+        Computes the standings of all competitions from the match results
+
+        Needs numpy, competitions that are not loaded yet are fetched first.
+        :param points_win: points for a won match
+        :param points_draw: points for a tie
+        :return: StandingsEngine object
+        """
+        return StandingsEngine(self.competitions, points_win, points_draw)
+
+    @property
+    def team_index(self):
+        """
+        Index of the teams across all competitions, built on first use
+
+        :return: TeamIndex object
+        """
+        if self._team_index is None:
+            competitions = self.competitions
+            # Loading takes a crawl, the other users of the lock must not
+            # wait for it
+            for competition in competitions:
+                competition._load()
+            with self._lock:
+                if self._team_index is None:
+                    self._team_index = TeamIndex(competitions)
+        return self._team_index
+
+    @property
+    def match_index(self):
+        """
+        Index of the matches across all competitions, built on first use
+
+        :return: MatchIndex object
+        """
+        if self._match_index is None:
+            competitions = self.competitions
+            # Like for the team index, load before taking the lock
+            for competition in competitions:
+                competition._load()
+            with self._lock:
+                if self._match_index is None:
+                    self._match_index = MatchIndex(competitions)
+        return self._match_index
+
+    def _reindex(self, competition):
+        """
+        Brings the indexes that were built up to date with a competition
+
+        :param competition: Competition object that was refreshed
+        """
+        for index in (self._team_index, self._match_index):
+            if index is not None:
+                index.update(competition)
+
+    def _unindex(self, competition_url):
+        """
+        :param competition_url: url of a competition that is gone
+        """
+        for index in (self._team_index, self._match_index):
+            if index is not None:
+                index.remove(competition_url)
+
+    def query_matches(self, start=None, end=None, **filters):
+        """
+        Looks for matches in a kickoff range and/or by field value
+
+        :param start: earliest kickoff, datetime
+        :param end: kickoff to stop before, datetime
+        :param filters: location, referee and/or division, case and
+                        accents are ignored
+        :return: list of Match objects ordered by kickoff
+        """
+        return self.match_index.query(start, end, **filters)
+
+    def upcoming_matches(self, days=7, now=None, **filters):
+        """
+        :param days: number of days to look ahead
+        :param now: datetime to start from, defaults to now
+        :param filters: location, referee and/or division
+        :return: list of Match objects ordered by kickoff
+        """
+        now = now or datetime.now()
+        return self.query_matches(now, now + timedelta(days=days), **filters)
+
     def get_team(self, team_name):
         """
-        Gets a team object from input name. It stops iterating when found.
+        Gets a team object from input name.
 
         :param team_name: string of team name to look for.
         :return: Team object
         """
-        team = None
-        for competition in self.competitions:
-            team = next((team for team in competition.teams
-                         if team.name.lower() == team_name.encode('utf-8').lower()), None)
-            if team:
-                break
-        return team
+        return self.team_index.get(team_name)
 
     def search_team(self, team_name):
         """
@@ -94,16 +687,37 @@ class Footy(object):
         :param team_name: string of team name to look for.
         :return: list of Team object(s)
         """
-        possible_teams = []
         self.logger.info("Searching for team {}".format(team_name))
-        for competition in self.competitions:
-            for team in competition.teams:
-                if team_name.encode('utf-8').lower() in team.name.lower():
-                    possible_teams.append(team)
+        possible_teams = self.team_index.search(team_name)
         self.logger.info("Found {} team(s)".format(len(possible_teams)))
         return possible_teams
 
 
+class Changes(object):
+    """
+    Changes found when refreshing a competition
+
+    Changed objects are listed together with the Row they had before,
+    so consumers can tell what moved.
+    """
+
+    def __init__(self, competition):
+        self.competition = competition
+        self.new_teams = []
+        self.removed_teams = []
+        self.standings = []
+        self.new_matches = []
+        self.removed_matches = []
+        self.results = []
+        self.rescheduled = []
+        self.updated_matches = []
+
+    def __bool__(self):
+        return any((self.new_teams, self.removed_teams, self.standings,
+                    self.new_matches, self.removed_matches, self.results,
+                    self.rescheduled, self.updated_matches))
+
+
 class Competition(object):
     """
     Gets competitions from location, url and name.
@@ -111,16 +725,26 @@ class Competition(object):
     Object that has all attributes for a competition
 
     """
+    SECTIONS = ('banner', 'previous-matches')
 
     def __init__(self, footy_instance, url):
         self._logger = logging.getLogger('{base}.{suffix}'.format(
             base=LOGGER_BASENAME, suffix=self.__class__.__name__))
-        self._session = footy_instance._session
+        self._footy = footy_instance
         self._populate(url)
         self._teams = []
         self._matches = []
+        self._teams_by_name = {}
+        self._matches_by_team = {}
         self._calendar = None
-        self._soup = None
+        self._calendar_feed = None
+        self._sections = None
+        # Single flight for the page, the teams and the matches
+        self._lock = threading.RLock()
+
+    @property
+    def _session(self):
+        return self._footy._session
 
     def _populate(self, url):
         """
@@ -131,6 +755,13 @@ class Competition(object):
         except KeyError:
             self._logger.exception("Got an exception in Competition")
 
+    @property
+    def division(self):
+        """
+        :return: division name from the standings heading
+        """
+        return self._get_table('banner').heading
+
     @property
     def teams(self):
         """
@@ -140,14 +771,29 @@ class Competition(object):
         :return: list of Team objects
         """
         if not self._teams:
-            standings = self._get_table('banner')
-            division = standings.h2.text
-            for teams in standings.find('table').find_all('tr'):
-                team = teams.find_all('td')
-                if team:
-                    self._teams.append(Team(self, team, division))
+            with self._lock:
+                if not self._teams:
+                    standings = self._get_table('banner')
+                    with METRICS.timer('footylib_rows_seconds',
+                                       kind='teams'):
+                        teams = [Team(self, team, standings.heading)
+                                 for team in standings.rows]
+                        self._teams_by_name = self._by_name(teams)
+                        self._teams = teams
+                    METRICS.count('footylib_objects_total', len(teams),
+                                  kind='team')
         return self._teams
 
+    @staticmethod
+    def _by_name(teams):
+        teams_by_name = {}
+        for team in teams:
+            teams_by_name.setdefault(team.name, team)
+        return teams_by_name
+
+    def _index_teams(self):
+        self._teams_by_name = self._by_name(self._teams)
+
     @property
     def matches(self):
         """
@@ -157,25 +803,241 @@ class Competition(object):
         :return: list of Match objects
         """
         if not self._matches:
-            match_tables = self._get_table('previous-matches')
-            for matches in match_tables.find_all('tr'):
-                match = matches.find_all('td')
-                if match:
-                    self._matches.append(Match(self, match))
+            with self._lock:
+                if not self._matches:
+                    rows = self._get_table('previous-matches').rows
+                    with METRICS.timer('footylib_rows_seconds',
+                                       kind='matches'):
+                        matches = [Match(self, match) for match in rows]
+                        self._matches_by_team = self._by_team(matches)
+                        self._matches = matches
+                    METRICS.count('footylib_objects_total', len(matches),
+                                  kind='match')
         return self._matches
 
+    @staticmethod
+    def _by_team(matches):
+        matches_by_team = defaultdict(list)
+        for match in matches:
+            for name in set(match.team_names):
+                matches_by_team[name].append(match)
+        return dict(matches_by_team)
+
+    def _index_matches(self):
+        self._matches_by_team = self._by_team(self._matches)
+
+    def _team_by_name(self, team_name):
+        """
+        :param team_name: exact team name as in the standings table
+        :return: Team object or None
+        """
+        _ = self.teams
+        return self._teams_by_name.get(team_name)
+
+    def _matches_for(self, team_name):
+        """
+        :param team_name: exact team name as in the match titles
+        :return: list of Match objects the team plays in
+        """
+        _ = self.matches
+        return list(self._matches_by_team.get(team_name, []))
+
+    def _load(self):
+        """
+        Fetches the competition page and parses its teams and matches
+
+        :return: Competition object
+        """
+        _ = self.teams
+        _ = self.matches
+        return self
+
+    def _fetch_unloaded(self):
+        """
+        :return: competition page HTML, or None when the competition got
+                 loaded in the meantime
+        """
+        if self._sections is not None:
+            return None
+        return self._footy._fetch(self.url)
+
+    def _assemble(self, sections, kickoffs):
+        """
+        Builds teams and matches from a page parsed somewhere else
+
+        Nothing is replaced when the competition got loaded in the
+        meantime, so objects handed out already stay the indexed ones.
+        :param sections: dictionary of section id to Section
+        :param kickoffs: parsed kickoff of every match row
+        :return: True when the competition was assembled
+        """
+        with self._lock:
+            if self._sections is not None:
+                return False
+            standings = sections.get('banner') or Section(None, [])
+            teams = [Team(self, row, standings.heading)
+                     for row in standings.rows]
+            rows = (sections.get('previous-matches') or Section(None, [])).rows
+            matches = [Match(self, row, kickoff=kickoff)
+                       for row, kickoff in zip(rows, kickoffs)]
+            self._teams_by_name = self._by_name(teams)
+            self._teams = teams
+            self._matches_by_team = self._by_team(matches)
+            self._matches = matches
+            self._sections = sections
+        return True
+
+    def refresh(self):
+        """
+        Fetches the competition page again and updates teams and matches
+
+        Teams are matched by name and matches by title (and the order of
+        the title for rematches), so existing objects stay valid and only
+        the ones whose row changed are updated. The team and match
+        indexes of the Footy object are brought up to date as well.
+        :return: Changes object
+        """
+        with self._lock:
+            changes = self._refresh()
+        if changes:
+            self._footy._reindex(self)
+        return changes
+
+    def _refresh(self):
+        changes = Changes(self)
+        if self._sections is None:
+            changes.new_teams.extend(self.teams)
+            changes.new_matches.extend(self.matches)
+            return changes
+        self._load()
+        page = self._footy._fetch(self.url, revalidate=True)
+        sections = self._parse(page)
+        if sections == self._sections:
+            return changes
+        old_teams = self._get_table('banner').rows
+        old_matches = self._get_table('previous-matches').rows
+        teams = self._refresh_teams(sections, old_teams, changes)
+        matches = self._refresh_matches(sections, old_matches, changes)
+        for team in teams:
+            team._calendar = None
+            team._calendar_feed = None
+        for match in matches:
+            match._home_team = match._visiting_team = None
+        # Lock-free readers only look at the sections when they are
+        # missing, so they go last, after the new teams and matches
+        self._calendar = None
+        self._calendar_feed = None
+        self._teams_by_name = self._by_name(teams)
+        self._teams = teams
+        self._matches_by_team = self._by_team(matches)
+        self._matches = matches
+        self._sections = sections
+        return changes
+
+    def _refresh_teams(self, sections, old_rows, changes):
+        """
+        :param sections: dictionary of section id to Section of the new page
+        :param old_rows: standings rows of the current teams
+        :param changes: Changes object to fill
+        :return: list of Team objects in the order of the new page
+        """
+        standings = sections.get('banner') or Section(None, [])
+        previous = {team.name: (team, row)
+                    for team, row in zip(self._teams, old_rows)}
+        teams = []
+        for row in standings.rows:
+            name = Team.Row(*row).name.encode('utf-8').strip()
+            if name not in previous:
+                team = Team(self, row, standings.heading)
+                changes.new_teams.append(team)
+            else:
+                team, old_row = previous.pop(name)
+                if row != old_row or team.division != standings.heading:
+                    team._update(row, standings.heading)
+                    changes.standings.append((team, Team.Row(*old_row)))
+            teams.append(team)
+        changes.removed_teams.extend(team for team, _ in previous.values())
+        return teams
+
+    def _refresh_matches(self, sections, old_rows, changes):
+        """
+        :param sections: dictionary of section id to Section of the new page
+        :param old_rows: match rows of the current matches
+        :param changes: Changes object to fill
+        :return: list of Match objects in the order of the new page
+        """
+        rows = (sections.get('previous-matches') or Section(None, [])).rows
+        previous = {}
+        for key, match, row in self._keyed(
+                (match.title, (match, row))
+                for match, row in zip(self._matches, old_rows)):
+            previous[key] = (match, row)
+        matches = []
+        for key, row, _ in self._keyed(
+                (Match.Row(*row).title.encode('utf-8'), (row, None))
+                for row in rows):
+            if key not in previous:
+                match = Match(self, row)
+                changes.new_matches.append(match)
+            else:
+                match, old_row = previous.pop(key)
+                if row != old_row:
+                    new, old = Match.Row(*row), Match.Row(*old_row)
+                    match._update(row)
+                    if new.score != old.score:
+                        changes.results.append((match, old))
+                    if new.datetime != old.datetime:
+                        changes.rescheduled.append((match, old))
+                    if new._replace(score=old.score,
+                                    datetime=old.datetime) != old:
+                        changes.updated_matches.append((match, old))
+            matches.append(match)
+        changes.removed_matches.extend(match for match, _ in previous.values())
+        return matches
+
+    @staticmethod
+    def _keyed(items):
+        """
+        Keys items by title and the occurrence of that title
+
+        :param items: iterable of (title, (first, second))
+        :return: generator of ((title, occurrence), first, second)
+        """
+        seen = Counter()
+        for title, (first, second) in items:
+            yield (title, seen[title]), first, second
+            seen[title] += 1
+
+    def _parse(self, page):
+        """
+        :param page: competition page HTML
+        :return: dictionary of section id to Section
+        """
+        with METRICS.timer('footylib_parse_seconds'):
+            return self._footy._parser.sections(page, self.SECTIONS)
+
     def _get_table(self, section_attr):
         """
-        Gets according section tag
+        Gets according section rows
 
-        This is used for teams and matches
+        This is used for teams and matches. The page is parsed once for
+        all sections, only the rows are kept afterwards.
         :param section_attr: name of the section id attribute
-        :return: BFS object
+        :return: Section object
         """
-        if not self._soup:
-            competition_page = self._session.get(self.url)
-            self._soup = Bfs(competition_page.text, "html.parser")
-        return self._soup.find('section', {'id': '{}'.format(section_attr)})
+        sections = self._sections
+        if sections is None:
+            with self._lock:
+                if self._sections is None:
+                    self._sections = self._parse(
+                        self._footy._fetch(self.url))
+                sections = self._sections
+        section = sections.get(section_attr)
+        if section is None:
+            self._logger.error("No {} section in {}".format(section_attr,
+                                                            self.url))
+            section = Section(None, [])
+        return section
 
     @property
     def calendar(self):
@@ -185,12 +1047,59 @@ class Competition(object):
         :return: Calendar string
         """
         if not self._calendar:
-            self._calendar = Calendar()
-            for team in self.teams:
-                for event in team.events:
-                    self._calendar.add_component(event)
+            with METRICS.timer('footylib_calendar_seconds',
+                               kind='competition'):
+                self._calendar = _calendar()
+                for match in self.matches:
+                    self._calendar.add_component(match.event)
         return self._calendar
 
+    def write_calendar(self, stream):
+        """
+        Writes a RFC2445 (iCalendar) for all the matches in a competition
+        without building the Calendar object
+
+        :param stream: binary file or anything with a write method
+        """
+        footylibCalendar.write_calendar(self.matches, stream)
+
+    @property
+    def calendar_feed(self):
+        """
+        Finished calendar, only rebuilt when the matches changed
+
+        :return: CalendarFeed with the ICS bytes, ETag and gzipped bytes
+        """
+        if self._calendar_feed is None:
+            self._calendar_feed = self._footy.calendar_cache.feed(
+                self.matches)
+        return self._calendar_feed
+
+    def to_columns(self):
+        """
+        Typed NumPy columns of the teams and matches of the competition
+
+        :return: dictionary with 'teams' and 'matches', each a dictionary
+                 of column name to array
+        """
+        return footylibColumns.to_columns([self])
+
+    def write_csv(self, stream, table='matches'):
+        """
+        :param stream: text file opened with newline=''
+        :param table: 'teams' or 'matches'
+        :return: number of records written
+        """
+        return footylibColumns.write_csv([self], stream, table)
+
+    def write_jsonl(self, stream, table='matches'):
+        """
+        :param stream: text file
+        :param table: 'teams' or 'matches'
+        :return: number of records written
+        """
+        return footylibColumns.write_jsonl([self], stream, table)
+
 
 class Team(object):
     """
@@ -209,21 +1118,24 @@ class Team(object):
                               'goals',
                               'diff',
                               'points'])
+    __slots__ = ('competition',
+                 'division',
+                 '_calendar',
+                 '_calendar_feed') + Row._fields
+    logger = logging.getLogger('{base}.Team'.format(base=LOGGER_BASENAME))
 
     def __init__(self, competition_instance, team_details, division):
-        self.logger = logging.getLogger('{base}.{suffix}'.format(
-            base=LOGGER_BASENAME, suffix=self.__class__.__name__))
-        self._session = competition_instance._session
         self.competition = competition_instance
-        self._populate(Team.Row(*[info.text for info in team_details]))
+        self._populate(Team.Row(*team_details))
         self._calendar = None
+        self._calendar_feed = None
         self.division = division
 
     def _populate(self, team_details):
         """
         It gets the row from standingstable for the requested Team
         and then it gets the index accordingly to every column.
-        :param team_details: BFS object
+        :param team_details: Row namedtuple
         """
         try:
             self.position = team_details.position
@@ -238,14 +1150,25 @@ class Team(object):
         except AttributeError:
             self.logger.exception("Got an exception while populating a team")
 
+    def _update(self, team_details, division):
+        """
+        Refreshes the team from a new standings row
+
+        :param team_details: list of cell texts
+        :param division: division name
+        """
+        self._populate(Team.Row(*team_details))
+        self.division = division
+        self._calendar = None
+        self._calendar_feed = None
+
     @property
     def matches(self):
         """
         Gets all matches for a Team
         :return: list of Match objects
         """
-        return [match for match in self.competition.matches
-                if self.name in match.title]
+        return self.competition._matches_for(self.name)
 
     @property
     def events(self):
@@ -262,11 +1185,33 @@ class Team(object):
         :return: Calendar string
         """
         if not self._calendar:
-            self._calendar = Calendar()
-            for event in self.events:
-                self._calendar.add_component(event)
+            with METRICS.timer('footylib_calendar_seconds', kind='team'):
+                self._calendar = _calendar()
+                for event in self.events:
+                    self._calendar.add_component(event)
         return self._calendar
 
+    def write_calendar(self, stream):
+        """
+        Writes a RFC2445 (iCalendar) for all the matches of a Team
+        without building the Calendar object
+
+        :param stream: binary file or anything with a write method
+        """
+        footylibCalendar.write_calendar(self.matches, stream)
+
+    @property
+    def calendar_feed(self):
+        """
+        Finished calendar, only rebuilt when the Team's matches changed
+
+        :return: CalendarFeed with the ICS bytes, ETag and gzipped bytes
+        """
+        if self._calendar_feed is None:
+            self._calendar_feed = self.competition._footy.calendar_cache.feed(
+                self.matches)
+        return self._calendar_feed
+
 
 class Match(object):
     """
@@ -283,30 +1228,51 @@ class Match(object):
                                'referee',
                                'motm',
                                'info'])
+    __slots__ = ('competitions',
+                 'team_names',
+                 '_calendar',
+                 '_event',
+                 '_visiting_team',
+                 '_visiting_team_goals',
+                 '_home_team',
+                 '_home_team_goals',
+                 '_result') + Row._fields
+    logger = logging.getLogger('{base}.Match'.format(base=LOGGER_BASENAME))
 
-    def __init__(self, competition_instance, match_details):
-        self.logger = logging.getLogger('{base}.{suffix}'.format(
-            base=LOGGER_BASENAME, suffix=self.__class__.__name__))
-        self._populate(Match.Row(*[detail.text for detail in match_details]))
+    def __init__(self, competition_instance, match_details,
+                 kickoff=NOT_PARSED):
+        """
+        :param competition_instance: Competition object
+        :param match_details: list of cell texts
+        :param kickoff: already parsed datetime (or None when it could not
+                        be parsed), skips parsing the kickoff
+        """
+        self._populate(Match.Row(*match_details), kickoff)
         self.competitions = competition_instance
         self._calendar = None
+        self._event = None
         self._visiting_team = None
         self._visiting_team_goals = None
         self._home_team = None
         self._home_team_goals = None
-        self.event = FootyEvent(self.datetime, self.title, self.location, self.info)
+        self._result = NOT_PARSED
 
-    def _populate(self, match_details):
+    def _populate(self, match_details, kickoff=NOT_PARSED):
         """
         It gets the row from matchtable for the requested Team
         and then it gets the value accordingly to every column.
 
-        :param info: BFS object
+        :param match_details: Row namedtuple
+        :param kickoff: already parsed datetime
         """
         try:
-            self.datetime = self.__string_to_datetime(match_details.datetime)
+            if kickoff is NOT_PARSED:
+                kickoff = self.__string_to_datetime(match_details.datetime)
+            self.datetime = kickoff
             self.location = match_details.location
             self.title = match_details.title.encode('utf-8')
+            home, _, visiting = self.title.partition(b' - ')
+            self.team_names = (home.strip(), visiting.strip())
             self.score = match_details.score
             self.referee = match_details.referee
             self.motm = match_details.motm
@@ -314,6 +1280,31 @@ class Match(object):
         except AttributeError:
             self.logger.exception("Got an exception while populating a match")
 
+    def _update(self, match_details):
+        """
+        Refreshes the match from a new matches row
+
+        :param match_details: list of cell texts
+        """
+        self._populate(Match.Row(*match_details))
+        self._calendar = None
+        self._event = None
+        self._visiting_team = None
+        self._visiting_team_goals = None
+        self._home_team = None
+        self._home_team_goals = None
+        self._result = NOT_PARSED
+
+    @property
+    def event(self):
+        """
+        :return: Event object for the match, built on first access
+        """
+        if self._event is None:
+            self._event = FootyEvent(self.datetime, self.title,
+                                     self.location, self.info)
+        return self._event
+
     @property
     def visiting_team(self):
         """
@@ -341,13 +1332,11 @@ class Match(object):
         :param home_team: Boolean
         :return: home/visiting team name
         """
-        home, visiting = self.title.split(' - ')
-        match = home.strip()
+        home, visiting = self.team_names
+        match = home
         if not home_team:
-            match = visiting.strip()
-        team = next((team for team in self.competitions.teams
-                     if team.name == match), None)
-        return team
+            match = visiting
+        return self.competitions._team_by_name(match)
 
     def _get_match_goals(self, home_team_goals=True):
         """
@@ -359,23 +1348,15 @@ class Match(object):
         :param home_team_goals: Boolean
         :return: home/visiting goals for a team
         """
-        try:
-            # Match not started (-:-)
-            home, visiting = self.score.split(':')
-        except ValueError:
-            # Played match (0 - 0)
-            home, visiting = self.score.split('-')
-        score = home.strip()
-        if not home_team_goals:
-            score = visiting.strip()
-        return score
+        home, visiting = _split_score(self.score)
+        return home if home_team_goals else visiting
 
     @property
     def home_team_goals(self):
         """
         :return: home team goals in a match
         """
-        if not self._home_team_goals:
+        if self._home_team_goals is None:
             self._home_team_goals = self._get_match_goals()
         return self._home_team_goals
 
@@ -384,11 +1365,25 @@ class Match(object):
         """
         :return: visiting team goals in a match
         """
-        if not self._visiting_team_goals:
+        if self._visiting_team_goals is None:
             self._visiting_team_goals = self._get_match_goals(
                                                         home_team_goals=False)
         return self._visiting_team_goals
 
+    @property
+    def result(self):
+        """
+        :return: tuple of home and visiting goals as integers,
+                 None when the match has not been played
+        """
+        if self._result is NOT_PARSED:
+            try:
+                self._result = (int(self.home_team_goals),
+                                int(self.visiting_team_goals))
+            except ValueError:
+                self._result = None
+        return self._result
+
     @property
     def calendar(self):
         """
@@ -396,7 +1391,7 @@ class Match(object):
         :return: Calendar string
         """
         if not self._calendar:
-            self._calendar = Calendar()
+            self._calendar = _calendar()
             self._calendar.add_component(self.event)
         return self._calendar
 
@@ -404,17 +1399,16 @@ class Match(object):
     def __string_to_datetime(datetime_string):
         """
         Converts date and time string into a datetime object
+
+        The fixed Footy layout is parsed directly, dateparser is only
+        used for anything that does not fit it.
         :param datetime_string: 05.09.2017 21:30
         :return: datetime object
         """
-        datetime_object = None
-        try:
-            datetime_object = parse(date_string=datetime_string,
-                                    date_formats=['%d.%m.%Y %H:%M'],
-                                    settings={'TIMEZONE': 'Europe/Amsterdam'})
-        except AttributeError:
-            LOGGER.exception("Couldn't parse this datetime.")
-        return datetime_object
+        if not METRICS.enabled:
+            return _string_to_datetime(datetime_string)
+        with METRICS.timer('footylib_kickoff_parse_seconds'):
+            return _string_to_datetime(datetime_string)
 
 
 class FootyEvent(object):
@@ -429,6 +1423,12 @@ class FootyEvent(object):
         :param location: location field for the match
         :return: event object
         """
+        with METRICS.timer('footylib_event_seconds'):
+            return cls._event(match_date, match_title, location, match_info)
+
+    @staticmethod
+    def _event(match_date, match_title, location, match_info):
+        from icalendar import Event, vText
         event = Event()
         try:
             event.add('dtstart', match_date)
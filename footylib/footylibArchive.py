@@ -0,0 +1,300 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: footylibArchive.py
+
+"""
+Season archive of crawled competitions
+
+Every season is a directory with an append-only data file and a JSON
+index. The data file holds zlib compressed records, one per competition
+and one per team (with the matches of that team) for every crawl in
+which they changed. The index maps competitions and normalized team
+names to the offsets of their records, and the data file is read
+through mmap, so a query only decompresses the records it needs. The
+digests used to skip unchanged records are kept in a file of their own,
+queries never read it.
+"""
+
+import os
+import json
+import mmap
+import zlib
+import hashlib
+import logging
+import time
+import tempfile
+import threading
+from datetime import datetime
+from collections import namedtuple
+from .footylibIndex import normalize
+
+
+LOGGER_BASENAME = '''footylib'''
+LOGGER = logging.getLogger('{}.archive'.format(LOGGER_BASENAME))
+LOGGER.addHandler(logging.NullHandler())
+
+DATA_FILE = 'data.bin'
+INDEX_FILE = 'index.json'
+DIGESTS_FILE = 'digests.json'
+# Seasons start in August, a kickoff in May 2018 is part of 2017-2018
+SEASON_START_MONTH = 8
+
+ArchivedMatch = namedtuple('ArchivedMatch', ['season',
+                                             'competition',
+                                             'kickoff',
+                                             'title',
+                                             'home_team',
+                                             'visiting_team',
+                                             'home_team_goals',
+                                             'visiting_team_goals',
+                                             'location',
+                                             'referee'])
+
+
+def season_of(kickoff):
+    """
+    :param kickoff: datetime object
+    :return: season name like 2017-2018
+    """
+    year = kickoff.year if kickoff.month >= SEASON_START_MONTH \
+        else kickoff.year - 1
+    return '{}-{}'.format(year, year + 1)
+
+
+def _goals(score):
+    from .footylib import _split_score
+    try:
+        return tuple(int(goals) for goals in _split_score(score))
+    except ValueError:
+        return None, None
+
+
+class Archive(object):
+    """
+    Directory of season partitions
+
+    Appending is safe between threads of one process. The index is
+    replaced atomically after the records were written, so a crash
+    while appending leaves unindexed bytes behind but no broken index.
+    """
+
+    def __init__(self, directory):
+        """
+        :param directory: directory that holds one directory per season
+        """
+        self.directory = directory
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._lock = threading.Lock()
+
+    def _path(self, season, name):
+        return os.path.join(self.directory, season, name)
+
+    def seasons(self):
+        """
+        :return: sorted list of archived season names
+        """
+        return sorted(name for name in os.listdir(self.directory)
+                      if os.path.isfile(self._path(name, INDEX_FILE)))
+
+    def _load_json(self, season, name, default):
+        try:
+            with open(self._path(season, name)) as content:
+                return json.load(content)
+        except IOError:
+            return default
+
+    def _index(self, season):
+        return self._load_json(season, INDEX_FILE,
+                               {'competitions': {}, 'teams': {},
+                                'crawls': []})
+
+    def _digests(self, season):
+        return self._load_json(season, DIGESTS_FILE, {})
+
+    def _write_json(self, season, name, content):
+        directory = os.path.join(self.directory, season)
+        handle, temporary = tempfile.mkstemp(dir=directory)
+        with os.fdopen(handle, 'w') as output:
+            json.dump(content, output, sort_keys=True)
+        os.replace(temporary, self._path(season, name))
+
+    @staticmethod
+    def _records(competition, crawled_at):
+        """
+        :param competition: loaded Competition object
+        :param crawled_at: timestamp of the crawl
+        :return: generator of (index name, key, record)
+        """
+        matches = [[list(row), match.datetime.isoformat()
+                    if match.datetime else None]
+                   for row, match in zip(
+                       competition._get_table('previous-matches').rows,
+                       competition.matches)]
+        division = competition.division
+        positions = {id(match): position
+                     for position, match in enumerate(competition.matches)}
+        yield 'competitions', competition.url, {
+            'url': competition.url,
+            'division': division,
+            'crawled_at': crawled_at,
+            'teams': [list(row)
+                      for row in competition._get_table('banner').rows],
+            'matches': matches}
+        # Teams of one competition can share a name, the occurrence tells
+        # them apart and, unlike the standings position, stays put
+        occurrences = {}
+        for team, row in zip(competition.teams,
+                             competition._get_table('banner').rows):
+            name = normalize(team.name)
+            occurrences[name] = occurrences.get(name, -1) + 1
+            yield 'teams', name, {
+                'url': competition.url,
+                'occurrence': occurrences[name],
+                'division': division,
+                'crawled_at': crawled_at,
+                'team': list(row),
+                'matches': [matches[positions[id(match)]] for match
+                            in competition._matches_for(team.name)]}
+
+    def append(self, competitions, season=None, crawled_at=None):
+        """
+        Archives the current state of competitions
+
+        Records that did not change since the last crawl of the season
+        are skipped. Without a season, every competition goes to the
+        season of its first kickoff.
+        :param competitions: iterable of Competition objects
+        :param season: season name, overrides the one of the kickoffs
+        :param crawled_at: timestamp of the crawl, defaults to now
+        :return: number of records written
+        """
+        crawled_at = crawled_at if crawled_at is not None else time.time()
+        partitions = {}
+        for competition in competitions:
+            name = season
+            if name is None:
+                kickoffs = [match.datetime for match in competition.matches
+                            if match.datetime is not None]
+                name = season_of(min(kickoffs) if kickoffs
+                                 else datetime.fromtimestamp(crawled_at))
+            partitions.setdefault(name, []).append(competition)
+        written = 0
+        with self._lock:
+            for name, members in sorted(partitions.items()):
+                written += self._append(name, members, crawled_at)
+        return written
+
+    def _append(self, season, competitions, crawled_at):
+        directory = os.path.join(self.directory, season)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        index = self._index(season)
+        # Archives written before the digests had a file of their own
+        digests = index.pop('digests', None) or self._digests(season)
+        written = 0
+        with open(self._path(season, DATA_FILE), 'ab') as data:
+            offset = data.tell()
+            for competition in competitions:
+                for kind, key, record in self._records(competition,
+                                                       crawled_at):
+                    content = dict(record, crawled_at=None)
+                    digest = hashlib.sha256(json.dumps(
+                        content, sort_keys=True).encode('utf-8')).hexdigest()
+                    digest_key = '{}:{}:{}:{}'.format(
+                        kind, record['url'], key, record.get('occurrence'))
+                    if digests.get(digest_key) == digest:
+                        continue
+                    payload = zlib.compress(json.dumps(
+                        record, sort_keys=True).encode('utf-8'))
+                    data.write(payload)
+                    index[kind].setdefault(key, []).append(
+                        [offset, len(payload)])
+                    digests[digest_key] = digest
+                    offset += len(payload)
+                    written += 1
+            data.flush()
+            os.fsync(data.fileno())
+        index['crawls'].append(crawled_at)
+        self._write_json(season, DIGESTS_FILE, digests)
+        self._write_json(season, INDEX_FILE, index)
+        LOGGER.info("Archived {} records in season {}".format(written,
+                                                              season))
+        return written
+
+    def _read(self, season, kind, key):
+        """
+        :return: generator of the records of key, oldest first
+        """
+        locations = self._index(season)[kind].get(key, [])
+        if not locations:
+            return
+        with open(self._path(season, DATA_FILE), 'rb') as data:
+            view = mmap.mmap(data.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                for offset, length in locations:
+                    yield json.loads(zlib.decompress(
+                        view[offset:offset + length]).decode('utf-8'))
+            finally:
+                view.close()
+
+    def _latest(self, season, kind, key):
+        """
+        :return: list of the last record of key per competition url and
+                 occurrence of the team name
+        """
+        latest = {}
+        for record in self._read(season, kind, key):
+            latest[record['url'], record.get('occurrence')] = record
+        return list(latest.values())
+
+    def competition(self, url, season):
+        """
+        :param url: url of the competition
+        :param season: season name
+        :return: last archived record of the competition or None
+        """
+        records = self._latest(season, 'competitions', url)
+        return records[0] if records else None
+
+    def history(self, team_name, seasons=None):
+        """
+        :param team_name: team name, case and accents are ignored
+        :param seasons: iterable of season names, all of them when omitted
+        :return: generator of every archived record of the team
+        """
+        for season in seasons or self.seasons():
+            for record in self._read(season, 'teams', normalize(team_name)):
+                yield season, record
+
+    def results(self, team_name, seasons=None):
+        """
+        All played matches of a team, from the last crawl of every season
+
+        :param team_name: team name, case and accents are ignored
+        :param seasons: iterable of season names, all of them when omitted
+        :return: list of ArchivedMatch ordered by season and kickoff
+        """
+        results = []
+        for season in seasons or self.seasons():
+            for record in self._latest(season, 'teams',
+                                       normalize(team_name)):
+                for row, kickoff in record['matches']:
+                    kickoff_time, location, title, score, referee = row[:5]
+                    home_goals, visiting_goals = _goals(score)
+                    if home_goals is None:
+                        continue
+                    home, _, visiting = title.partition(' - ')
+                    results.append(ArchivedMatch(
+                        season,
+                        record['url'],
+                        datetime.fromisoformat(kickoff) if kickoff else None,
+                        title,
+                        home.strip(),
+                        visiting.strip(),
+                        home_goals,
+                        visiting_goals,
+                        location,
+                        referee))
+        return sorted(results, key=lambda match: (
+            match.season, match.kickoff or datetime.min))
@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: footylibAsync.py
+
+"""
+Asyncio client for Footy.eu
+
+AsyncFooty fetches pages over a pooled keep-alive aiohttp connection and
+hands them to the same parser backends, Competition, Team and Match
+classes the synchronous Footy uses.
+"""
+
+import time
+import asyncio
+import logging
+from .footylib import Footy
+from .footylibCache import CacheEntry
+
+
+LOGGER_BASENAME = '''footylib'''
+LOGGER = logging.getLogger('{}.async'.format(LOGGER_BASENAME))
+LOGGER.addHandler(logging.NullHandler())
+
+
+class AsyncCompetition(object):
+    """
+    Awaitable view on a Competition
+
+    The page is fetched once, after that teams, matches and calendar
+    are served from the parsed rows.
+    """
+
+    def __init__(self, async_footy, competition):
+        self._async_footy = async_footy
+        self.competition = competition
+        self.url = competition.url
+        # Created on the running loop, Python < 3.10 binds it on creation
+        self._lock = None
+
+    async def _load(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.competition._sections is None:
+                page = await self._async_footy._fetch(self.url)
+                loop = asyncio.get_running_loop()
+                # Parsing is CPU bound, keep it off the event loop
+                self.competition._sections = await loop.run_in_executor(
+                    None, self._async_footy.footy._parser.sections,
+                    page, self.competition.SECTIONS)
+        return self.competition
+
+    async def division(self):
+        """
+        :return: division name from the standings heading
+        """
+        return (await self._load()).division
+
+    async def teams(self):
+        """
+        :return: list of Team objects
+        """
+        return (await self._load()).teams
+
+    async def matches(self):
+        """
+        :return: list of Match objects
+        """
+        return (await self._load()).matches
+
+    async def calendar(self):
+        """
+        :return: Calendar object with all the matches of the competition
+        """
+        return (await self._load()).calendar
+
+
+class AsyncFooty(object):
+    """
+    Asyncio counterpart of Footy
+
+    Can be used as an async context manager, the connection pool is
+    closed on exit.
+    """
+
+    def __init__(self, max_concurrency=8, max_per_host=4, cache=None,
+                 parser='strained', calendar_cache=None, site=None,
+                 timeout=30):
+        """
+        :param max_concurrency: maximum requests in flight
+        :param max_per_host: maximum pooled connections against one host
+        :param cache: ResponseCache object to keep pages between instances
+        :param parser: name of a parser backend, see footylibParsers.BACKENDS
+        :param calendar_cache: CalendarCache object
+        :param site: url of the league page, defaults to the one of Footy
+        :param timeout: total seconds a request may take
+        """
+        self.footy = Footy(cache=cache, parser=parser,
+                           calendar_cache=calendar_cache)
+        self.footy._async = True
+        if site:
+            self.footy._site = site
+        self._max_per_host = max_per_host
+        self._timeout = timeout
+        self._max_concurrency = max_concurrency
+        # Created on the running loop, Python < 3.10 binds them on creation
+        self._semaphore = None
+        self._client = None
+        self._competitions = None
+        self._lock = None
+
+    def _get_client(self):
+        if self._client is None:
+            import aiohttp
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self._max_per_host)
+            self._client = aiohttp.ClientSession(
+                connector=connector,
+                headers=dict(self.footy.transport.headers),
+                timeout=aiohttp.ClientTimeout(total=self._timeout))
+        return self._client
+
+    async def close(self):
+        """
+        Closes the pooled connections
+        """
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def _fetch(self, url):
+        """
+        Gets a page, going through the response cache like Footy._fetch
+
+        :param url: url to retrieve
+        :return: page body as string
+        """
+        cache = self.footy._cache
+        entry = cache.get(url) if cache else None
+        if entry and cache.is_fresh(entry):
+            return entry.body
+        headers = entry.conditional_headers if entry else {}
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        async with self._semaphore:
+            async with self._get_client().get(url,
+                                              headers=headers) as response:
+                if entry and response.status == 304:
+                    cache.set(url, entry.touch())
+                    return entry.body
+                response.raise_for_status()
+                text = await response.text()
+                if cache:
+                    cache.set(url, CacheEntry(
+                        text,
+                        response.headers.get('ETag'),
+                        response.headers.get('Last-Modified'),
+                        time.time()))
+        return text
+
+    async def competitions(self):
+        """
+        :return: list of AsyncCompetition objects
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._competitions is None:
+                self.footy._front_page = await self._fetch(self.footy._site)
+                self._competitions = [
+                    AsyncCompetition(self, competition)
+                    for competition in self.footy._get_competitions()]
+        return self._competitions
+
+    async def prefetch(self):
+        """
+        Fetches and parses all competition pages concurrently
+
+        :return: list of AsyncCompetition objects
+        """
+        competitions = await self.competitions()
+        tasks = [asyncio.ensure_future(competition._load())
+                 for competition in competitions]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # Do not leave the other pages loading in the background
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return competitions
+
+    async def teams(self):
+        """
+        :return: list of Team objects of all competitions
+        """
+        competitions = await self.prefetch()
+        return [team for competition in competitions
+                for team in competition.competition.teams]
+
+    async def matches(self):
+        """
+        :return: list of Match objects of all competitions
+        """
+        competitions = await self.prefetch()
+        return [match for competition in competitions
+                for match in competition.competition.matches]
+
+    async def get_team(self, team_name):
+        """
+        :param team_name: string of team name to look for.
+        :return: Team object
+        """
+        await self.prefetch()
+        return self.footy.get_team(team_name)
+
+    async def search_team(self, team_name):
+        """
+        :param team_name: string of team name to look for.
+        :return: list of Team object(s)
+        """
+        await self.prefetch()
+        return self.footy.search_team(team_name)
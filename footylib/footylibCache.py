@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: footylibCache.py
+
+"""Response caches for the pages that Footy retrieves"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+from collections import namedtuple
+
+
+LOGGER_BASENAME = '''footylib'''
+LOGGER = logging.getLogger('{}.cache'.format(LOGGER_BASENAME))
+LOGGER.addHandler(logging.NullHandler())
+
+
+class CacheEntry(namedtuple('CacheEntry', ['body',
+                                           'etag',
+                                           'last_modified',
+                                           'stored_at'])):
+    """
+    A cached page body with the validators the server sent along
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_response(cls, response):
+        """
+        :param response: Response object with a 200 status
+        :return: CacheEntry object
+        """
+        return cls(response.text,
+                   response.headers.get('ETag'),
+                   response.headers.get('Last-Modified'),
+                   time.time())
+
+    @property
+    def conditional_headers(self):
+        """
+        :return: dictionary with If-None-Match/If-Modified-Since headers
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def touch(self):
+        """
+        :return: same entry marked as revalidated now
+        """
+        return self._replace(stored_at=time.time())
+
+
+class ResponseCache(object):
+    """
+    Base response cache keyed by URL
+
+    Subclasses only have to implement get and set. Entries younger
+    than ttl seconds are served without touching the network, older
+    entries are revalidated with a conditional request.
+    """
+
+    def __init__(self, ttl=0):
+        """
+        :param ttl: seconds an entry is served without revalidation
+        """
+        self.ttl = ttl
+
+    def get(self, url):
+        """
+        :param url: url of the page
+        :return: CacheEntry object or None
+        """
+        raise NotImplementedError
+
+    def set(self, url, entry):
+        """
+        :param url: url of the page
+        :param entry: CacheEntry object
+        """
+        raise NotImplementedError
+
+    def is_fresh(self, entry):
+        """
+        :param entry: CacheEntry object
+        :return: True if the entry can be served without revalidation
+        """
+        return time.time() - entry.stored_at < self.ttl
+
+
+class MemoryCache(ResponseCache):
+    """
+    Response cache that lives as long as the process
+    """
+
+    def __init__(self, ttl=0):
+        super(MemoryCache, self).__init__(ttl)
+        self._entries = {}
+
+    def get(self, url):
+        return self._entries.get(url)
+
+    def set(self, url, entry):
+        self._entries[url] = entry
+
+
+class FileCache(ResponseCache):
+    """
+    Response cache that stores one JSON file per URL in a directory
+    """
+
+    def __init__(self, directory, ttl=0):
+        """
+        :param directory: directory to keep the cached pages in
+        :param ttl: seconds an entry is served without revalidation
+        """
+        super(FileCache, self).__init__(ttl)
+        self.directory = directory
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def _path(self, url):
+        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, '{}.json'.format(digest))
+
+    def get(self, url):
+        try:
+            with open(self._path(url)) as cached:
+                return CacheEntry(**json.load(cached))
+        except IOError:
+            return None
+        except (ValueError, TypeError):
+            LOGGER.exception("Ignoring corrupt cache entry for {}".format(url))
+            return None
+
+    def set(self, url, entry):
+        handle, temporary = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(handle, 'w') as cached:
+            json.dump(entry._asdict(), cached)
+        os.replace(temporary, self._path(url))
@@ -0,0 +1,318 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: footylibCalendar.py
+
+"""
+Streaming RFC 5545 (iCalendar) writer for matches
+
+Writes the same VEVENTs as FootyEvent straight to a binary stream,
+without building icalendar Calendar/Event objects first.
+"""
+
+import io
+import os
+import re
+import gzip
+import hashlib
+import logging
+import threading
+import unicodedata
+from datetime import timezone
+from urllib.parse import urlparse
+from collections import namedtuple, OrderedDict
+from .footylibMetrics import METRICS
+
+
+LOGGER_BASENAME = '''footylib'''
+LOGGER = logging.getLogger('{}.calendar'.format(LOGGER_BASENAME))
+LOGGER.addHandler(logging.NullHandler())
+
+CRLF = b'\r\n'
+LINE_OCTETS = 75
+DURATION = b'PT50M'
+
+
+def _text(value):
+    if value is None:
+        return u''
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return value
+
+
+def escape(value):
+    """
+    Escapes a TEXT value
+
+    :param value: string or bytes
+    :return: escaped string
+    """
+    return (_text(value).replace('\\', '\\\\')
+                        .replace(';', '\\;')
+                        .replace(',', '\\,')
+                        .replace('\r\n', '\\n')
+                        .replace('\r', '\\n')
+                        .replace('\n', '\\n'))
+
+
+def fold(line):
+    """
+    Folds a content line the way icalendar does
+
+    Every line holds at most 74 octets besides the leading space of the
+    continuation lines, characters are never split and an escape
+    character is moved to the next line together with what it escapes.
+    :param line: content line as string
+    :return: folded line as bytes, including the line break
+    """
+    encoded = line.encode('utf-8')
+    if len(encoded) < LINE_OCTETS:
+        return encoded + CRLF
+    parts = []
+    current, size = [], 0
+    for character in line:
+        octets = character.encode('utf-8')
+        if current and size + len(octets) >= LINE_OCTETS:
+            if len(current) > 1 and current[-1] in (b'\\', b'^'):
+                escape_character = current.pop()
+                parts.append(b''.join(current))
+                current, size = [escape_character], 1
+            else:
+                parts.append(b''.join(current))
+                current, size = [], 0
+        current.append(octets)
+        size += len(octets)
+    parts.append(b''.join(current))
+    return (CRLF + b' ').join(parts) + CRLF
+
+
+def _date_time(value):
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    return value.strftime('%Y%m%dT%H%M%S')
+
+
+def vevent(match):
+    """
+    Serializes a match as the VEVENT that FootyEvent would build
+
+    :param match: Match object
+    :return: VEVENT as bytes
+    """
+    lines = [b'BEGIN:VEVENT' + CRLF,
+             fold(u'SUMMARY:' + escape(match.title))]
+    if match.datetime is not None:
+        lines.append(fold(u'DTSTART:' + _date_time(match.datetime)))
+    lines.append(b'DURATION:' + DURATION + CRLF)
+    lines.append(fold(u'LOCATION:' + escape(match.location)))
+    lines.append(fold(u'RESOURCES:' + escape(match.info)))
+    lines.append(b'END:VEVENT' + CRLF)
+    return b''.join(lines)
+
+
+class IcsWriter(object):
+    """
+    Writes a VCALENDAR to a binary stream one match at a time
+
+    Can be used as a context manager, END:VCALENDAR is written on exit.
+    """
+
+    def __init__(self, stream):
+        """
+        :param stream: anything with a write method that takes bytes
+        """
+        self._stream = stream
+        self._stream.write(b'BEGIN:VCALENDAR' + CRLF)
+
+    def write(self, match):
+        """
+        :param match: Match object
+        """
+        self._stream.write(vevent(match))
+
+    def write_event(self, event):
+        """
+        :param event: VEVENT bytes, as returned by vevent
+        """
+        self._stream.write(event)
+
+    def close(self):
+        self._stream.write(b'END:VCALENDAR' + CRLF)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def write_calendar(matches, stream):
+    """
+    Writes a VCALENDAR with one VEVENT per match
+
+    :param matches: iterable of Match objects
+    :param stream: anything with a write method that takes bytes
+    """
+    with METRICS.timer('footylib_ics_write_seconds'):
+        with IcsWriter(stream) as writer:
+            for match in matches:
+                writer.write(match)
+
+
+def _gzip(body):
+    """
+    :param body: bytes to compress
+    :return: gzip bytes without a timestamp, so equal bodies give equal
+             bytes (gzip.compress only takes mtime from Python 3.8 on)
+    """
+    stream = io.BytesIO()
+    with gzip.GzipFile(fileobj=stream, mode='wb', mtime=0) as compressed:
+        compressed.write(body)
+    return stream.getvalue()
+
+
+CalendarFeed = namedtuple('CalendarFeed', ['body', 'etag', 'gzipped'])
+
+
+class CalendarCache(object):
+    """
+    Finished calendars keyed by a hash of the matches they contain
+
+    Only the fields that end up in the VEVENTs are hashed, so a calendar
+    is rebuilt only when one of its matches changed. The least recently
+    used calendars are dropped once maxsize is reached.
+    """
+    VERSION = b'2'
+
+    def __init__(self, maxsize=4096):
+        """
+        :param maxsize: number of calendars to keep
+        """
+        self.maxsize = maxsize
+        self._feeds = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._feeds)
+
+    @classmethod
+    def digest(cls, matches):
+        """
+        :param matches: iterable of Match objects
+        :return: hex digest of the calendar content
+        """
+        content = hashlib.sha256(cls.VERSION)
+        for match in matches:
+            for value in (match.title,
+                          match.datetime.isoformat() if match.datetime else '',
+                          match.location,
+                          match.info):
+                content.update(b'\x00')
+                content.update(_text(value).encode('utf-8'))
+            content.update(b'\x01')
+        return content.hexdigest()
+
+    def feed(self, matches):
+        """
+        :param matches: list of Match objects
+        :return: CalendarFeed with the ICS bytes, a strong ETag and the
+                 gzip compressed ICS bytes
+        """
+        key = self.digest(matches)
+        with self._lock:
+            feed = self._feeds.get(key)
+            if feed is not None:
+                self._feeds.move_to_end(key)
+        if feed is not None:
+            METRICS.count('footylib_calendar_cache_requests_total',
+                          result='hit')
+            return feed
+        METRICS.count('footylib_calendar_cache_requests_total', result='miss')
+        stream = io.BytesIO()
+        write_calendar(matches, stream)
+        body = stream.getvalue()
+        METRICS.count('footylib_ics_bytes_total', len(body))
+        feed = CalendarFeed(body, '"{}"'.format(key), _gzip(body))
+        with self._lock:
+            self._feeds[key] = feed
+            while len(self._feeds) > self.maxsize:
+                self._feeds.popitem(last=False)
+        return feed
+
+    def clear(self):
+        with self._lock:
+            self._feeds.clear()
+
+
+# Shared by all Footy objects unless they are given their own
+CALENDAR_CACHE = CalendarCache()
+
+
+def slugify(value):
+    """
+    :param value: string or bytes
+    :return: lowercase ascii name that is safe as a file name
+    """
+    value = unicodedata.normalize('NFKD', _text(value))
+    value = value.encode('ascii', 'ignore').decode('ascii').lower()
+    return re.sub(r'[^a-z0-9]+', '-', value).strip('-') or 'unnamed'
+
+
+def competition_slug(competition):
+    """
+    :param competition: Competition object
+    :return: file name for the competition, taken from its url
+    """
+    path = urlparse(competition.url).path.strip('/')
+    return slugify(path.split('/')[-1] if path else competition.url)
+
+
+def export_calendars(competitions, directory):
+    """
+    Writes one .ics per competition and one per team in a single pass
+
+    Every match is serialized once and written to the calendar of its
+    competition and of both teams. The layout is
+    directory/<competition>.ics and directory/<competition>/<team>.ics
+    :param competitions: iterable of Competition objects
+    :param directory: directory to write the calendars to
+    :return: list of written paths
+    """
+    paths = []
+    for competition in competitions:
+        slug = competition_slug(competition)
+        team_directory = os.path.join(directory, slug)
+        if not os.path.isdir(team_directory):
+            os.makedirs(team_directory)
+        path = os.path.join(directory, '{}.ics'.format(slug))
+        team_files, team_writers = {}, {}
+        competition_file = open(path, 'wb')
+        paths.append(path)
+        try:
+            for team in competition.teams:
+                team_slug = slugify(team.name)
+                while team_slug in team_files:
+                    team_slug += '-'
+                team_path = os.path.join(team_directory,
+                                         '{}.ics'.format(team_slug))
+                team_files[team_slug] = open(team_path, 'wb')
+                # Teams with the same name share the matches of that name
+                team_writers.setdefault(team.name, []).append(
+                    IcsWriter(team_files[team_slug]))
+                paths.append(team_path)
+            with IcsWriter(competition_file) as writer:
+                for match in competition.matches:
+                    event = vevent(match)
+                    writer.write_event(event)
+                    for name in set(match.team_names):
+                        for team_writer in team_writers.get(name, ()):
+                            team_writer.write_event(event)
+            for writers in team_writers.values():
+                for team_writer in writers:
+                    team_writer.close()
+        finally:
+            competition_file.close()
+            for team_file in team_files.values():
+                team_file.close()
+    LOGGER.info("Exported {} calendars to {}".format(len(paths), directory))
+    return paths
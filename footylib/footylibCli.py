@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: footylibCli.py
+
+"""
+Command line entry point
+
+Every invocation crawls the site at most once. With --snapshot the crawl
+is stored and later invocations start from it without any request, with
+--cache the pages are kept on disk between crawls.
+
+Competitions whose page cannot be loaded are reported and left out, the
+command runs on the others and exits with status 1.
+
+Usage: footylib [--snapshot footy.db] [--cache DIR] <command> ...
+"""
+
+import os
+import sys
+import logging
+import argparse
+from .footylib import Footy
+from .footylibCache import FileCache
+from .footylibCalendar import slugify
+from .footylibExceptions import ErrorFetchingPage
+from .footylibParsers import BACKENDS
+
+
+LOGGER_BASENAME = '''footylib'''
+LOGGER = logging.getLogger('{}.cli'.format(LOGGER_BASENAME))
+LOGGER.addHandler(logging.NullHandler())
+
+
+def _text(value):
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return value
+
+
+def get_footy(args):
+    """
+    Loads the snapshot or crawls the site, saving the crawl if asked to
+
+    :param args: parsed arguments
+    :return: Footy object with all competitions loaded and the list of
+             urls of the competitions left out
+    """
+    options = {'max_workers': args.workers,
+               'parser': args.parser,
+               'processes': args.processes}
+    if args.cache:
+        options['cache'] = FileCache(args.cache, ttl=args.ttl)
+    if args.snapshot and os.path.exists(args.snapshot):
+        footy = Footy.load_snapshot(args.snapshot, **options)
+        if not args.refresh:
+            return footy, []
+        footy.refresh()
+    else:
+        footy = Footy(**options)
+        footy.prefetch()
+    failed = drop_failed(footy)
+    # Without any competition left, footy.competitions would crawl again
+    if args.snapshot and footy._competitions:
+        footy.save_snapshot(args.snapshot)
+    return footy, failed
+
+
+def drop_failed(footy):
+    """
+    Leaves out the competitions that did not load
+
+    Touching them again would fetch their page once more, so they are
+    removed like the competitions that left the league page.
+    :param footy: Footy object after a prefetch or refresh
+    :return: list of urls of the competitions left out
+    """
+    failed = [competition.url for competition in footy.competitions
+              if competition._sections is None]
+    for url in failed:
+        LOGGER.error("Leaving out {}, its page could not be "
+                     "loaded".format(url))
+        footy._urls.discard(url)
+    footy._competitions = [competition
+                           for competition in footy.competitions
+                           if competition.url not in failed]
+    return failed
+
+
+def _open_output(path):
+    if not path or path == '-':
+        return sys.stdout, False
+    return open(path, 'w', newline=''), True
+
+
+def crawl(footy, args):
+    print('{} competitions, {} teams, {} matches'.format(
+        len(footy.competitions),
+        sum(len(competition.teams) for competition in footy.competitions),
+        sum(len(competition.matches) for competition in footy.competitions)))
+    return 0
+
+
+def export(footy, args):
+    if not os.path.isdir(args.directory):
+        os.makedirs(args.directory)
+    if not args.team:
+        for path in footy.export_calendars(args.directory):
+            print(path)
+        return 0
+    status = 0
+    for team_name in args.team:
+        team = footy.get_team(team_name)
+        if team is None:
+            LOGGER.error("No team named {}".format(team_name))
+            status = 1
+            continue
+        path = os.path.join(args.directory,
+                            '{}.ics'.format(slugify(team.name)))
+        with open(path, 'wb') as ics:
+            team.write_calendar(ics)
+        print(path)
+    return status
+
+
+def dump(footy, args):
+    stream, close = _open_output(args.output)
+    try:
+        if args.format == 'jsonl':
+            footy.write_jsonl(stream, table=args.table)
+        else:
+            footy.write_csv(stream, table=args.table)
+    finally:
+        if close:
+            stream.close()
+    return 0
+
+
+def search(footy, args):
+    status = 0
+    for team_name in args.team:
+        teams = footy.search_team(team_name)
+        if not teams:
+            status = 1
+        for team in teams:
+            print('\t'.join((team_name,
+                             _text(team.name),
+                             _text(team.division or ''),
+                             team.competition.url)))
+    return status
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog='footylib', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--snapshot',
+                        help='snapshot to start from and to save the crawl to')
+    parser.add_argument('--refresh', action='store_true',
+                        help='refresh the snapshot before running')
+    parser.add_argument('--cache', help='directory to keep the pages in')
+    parser.add_argument('--ttl', type=int, default=300,
+                        help='seconds cached pages are used as they are')
+    parser.add_argument('--parser', default='strained',
+                        choices=sorted(BACKENDS))
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--verbose', action='store_true')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    command = commands.add_parser('crawl', help='crawl the site once')
+    command.set_defaults(function=crawl)
+
+    command = commands.add_parser('export', help='write calendars')
+    command.add_argument('directory')
+    command.add_argument('--team', action='append',
+                         help='team to export, all calendars when omitted')
+    command.set_defaults(function=export)
+
+    for table in ('standings', 'matches'):
+        command = commands.add_parser(table, help='dump all {}'.format(table))
+        command.add_argument('--format', choices=('csv', 'jsonl'),
+                             default='csv')
+        command.add_argument('--output', help='file to write, - for stdout')
+        command.set_defaults(function=dump,
+                             table='teams' if table == 'standings'
+                             else table)
+
+    command = commands.add_parser('search', help='look for teams')
+    command.add_argument('team', nargs='+')
+    command.set_defaults(function=search)
+    return parser
+
+
+def main(arguments=None):
+    """
+    :param arguments: list of arguments, sys.argv when omitted
+    :return: exit status
+    """
+    args = get_parser().parse_args(arguments)
+    logging.basicConfig(format='%(levelname)s %(name)s %(message)s')
+    logging.getLogger(LOGGER_BASENAME).setLevel(
+        logging.INFO if args.verbose else logging.WARNING)
+    try:
+        footy, failed = get_footy(args)
+    except ErrorFetchingPage as error:
+        LOGGER.error(error)
+        return 1
+    if not footy._competitions:
+        LOGGER.error("No competition could be loaded")
+        return 1
+    status = args.function(footy, args)
+    return status or (1 if failed else 0)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: footylibColumns.py
+
+"""
+Bulk export of teams and matches
+
+Records are read straight from the parsed rows of every competition, so
+no Team or Match objects are built for them. They are either gathered
+into typed NumPy columns (``pip install footylib[numpy]``) or streamed
+one at a time as CSV or JSON Lines.
+"""
+
+import csv
+import json
+import logging
+from datetime import datetime
+from .footylibStandings import _numpy
+
+
+LOGGER_BASENAME = '''footylib'''
+LOGGER = logging.getLogger('{}.columns'.format(LOGGER_BASENAME))
+LOGGER.addHandler(logging.NullHandler())
+
+TEAM_COLUMNS = (('competition', str),
+                ('division', str),
+                ('position', 'int64'),
+                ('name', str),
+                ('played_games', 'int64'),
+                ('won_games', 'int64'),
+                ('tie_games', 'int64'),
+                ('lost_games', 'int64'),
+                ('goals_for', 'int64'),
+                ('goals_against', 'int64'),
+                ('diff', 'int64'),
+                ('points', 'int64'))
+
+MATCH_COLUMNS = (('competition', str),
+                 ('kickoff', 'datetime64[s]'),
+                 ('location', str),
+                 ('title', str),
+                 ('home_team', str),
+                 ('visiting_team', str),
+                 ('score', str),
+                 ('played', bool),
+                 ('home_team_goals', 'int64'),
+                 ('visiting_team_goals', 'int64'),
+                 ('referee', str),
+                 ('motm', str),
+                 ('info', str))
+
+
+def _int(value):
+    """
+    :return: value as integer, 0 when the cell is empty or not a number
+    """
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def team_records(competitions):
+    """
+    :param competitions: iterable of Competition objects
+    :return: generator of tuples in the order of TEAM_COLUMNS
+    """
+    from .footylib import Team
+    for competition in competitions:
+        standings = competition._get_table('banner')
+        for cells in standings.rows:
+            row = Team.Row(*cells)
+            goals_for, _, goals_against = row.goals.partition('-')
+            yield (competition.url,
+                   standings.heading or '',
+                   _int(row.position),
+                   row.name.strip(),
+                   _int(row.played_games),
+                   _int(row.won_games),
+                   _int(row.tie_games),
+                   _int(row.lost_games),
+                   _int(goals_for),
+                   _int(goals_against),
+                   _int(row.diff),
+                   _int(row.points))
+
+
+def match_records(competitions):
+    """
+    Kickoffs that were already parsed for Match objects are reused
+
+    :param competitions: iterable of Competition objects
+    :return: generator of tuples in the order of MATCH_COLUMNS
+    """
+    from .footylib import Match, _string_to_datetime, _split_score
+    for competition in competitions:
+        rows = competition._get_table('previous-matches').rows
+        kickoffs = None
+        if competition._matches and len(competition._matches) == len(rows):
+            kickoffs = [match.datetime for match in competition._matches]
+        for position, cells in enumerate(rows):
+            row = Match.Row(*cells)
+            kickoff = kickoffs[position] if kickoffs else \
+                _string_to_datetime(row.datetime)
+            home, _, visiting = row.title.partition(' - ')
+            try:
+                goals = tuple(int(goal) for goal in _split_score(row.score))
+            except ValueError:
+                goals = None
+            yield (competition.url,
+                   kickoff,
+                   row.location,
+                   row.title,
+                   home.strip(),
+                   visiting.strip(),
+                   row.score,
+                   goals is not None,
+                   goals[0] if goals else 0,
+                   goals[1] if goals else 0,
+                   row.referee,
+                   row.motm,
+                   row.info)
+
+
+TABLES = {'teams': (TEAM_COLUMNS, team_records),
+          'matches': (MATCH_COLUMNS, match_records)}
+
+
+def _table(table):
+    try:
+        return TABLES[table]
+    except KeyError:
+        raise ValueError('table must be one of {}'.format(sorted(TABLES)))
+
+
+def to_columns(competitions):
+    """
+    Typed columns of all teams and matches
+
+    Numbers are int64, kickoffs datetime64 (NaT when they could not be
+    parsed) and text is unicode. Goals of matches that were not played
+    are 0, the played column tells them apart.
+    :param competitions: iterable of Competition objects
+    :return: dictionary with 'teams' and 'matches', each a dictionary of
+             column name to NumPy array
+    """
+    np = _numpy()
+    competitions = list(competitions)
+    result = {}
+    for table in ('teams', 'matches'):
+        columns, records = _table(table)
+        values = list(zip(*records(competitions))) or [()] * len(columns)
+        result[table] = {name: np.array(column, dtype=dtype)
+                         for (name, dtype), column in zip(columns, values)}
+    return result
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def write_csv(competitions, stream, table='matches'):
+    """
+    Writes one line per record, with a header
+
+    :param competitions: iterable of Competition objects
+    :param stream: text file opened with newline=''
+    :param table: 'teams' or 'matches'
+    :return: number of records written
+    """
+    columns, records = _table(table)
+    writer = csv.writer(stream)
+    writer.writerow([name for name, _ in columns])
+    count = 0
+    for record in records(competitions):
+        writer.writerow([_plain(value) for value in record])
+        count += 1
+    return count
+
+
+def write_jsonl(competitions, stream, table='matches'):
+    """
+    Writes one JSON object per line and record
+
+    :param competitions: iterable of Competition objects
+    :param stream: text file
+    :param table: 'teams' or 'matches'
+    :return: number of records written
+    """
+    columns, records = _table(table)
+    names = [name for name, _ in columns]
+    count = 0
+    for record in records(competitions):
+        stream.write(json.dumps(dict(zip(names, map(_plain, record))),
+                                ensure_ascii=False))
+        stream.write('\n')
+        count += 1
+    return count
@@ -26,3 +26,38 @@ class ErrorGettingLeague(Exception):
     def __str__(self):
         return "Specified league doesn't exist"
 
+
+
+class UnknownParserBackend(Exception):
+    def __init__(self, error_msg):
+        self.error_msg = error_msg
+
+    def __str__(self):
+        return "Parser backend is not available. {}".format(self.error_msg)
+
+
+class ErrorFetchingPage(Exception):
+    def __init__(self, url, reason):
+        self.url = url
+        self.reason = reason
+
+    def __str__(self):
+        return "Cannot fetch {}. {}".format(self.url, self.reason)
+
+
+class MissingOptionalDependency(Exception):
+    def __init__(self, error_msg):
+        self.error_msg = error_msg
+
+    def __str__(self):
+        return "Optional dependency is not installed. {}".format(
+            self.error_msg)
+
+
+class BlockingFetchOnEventLoop(Exception):
+    def __init__(self, url):
+        self.url = url
+
+    def __str__(self):
+        return "Cannot fetch {} with a blocking request from a running " \
+               "event loop, load it through AsyncFooty".format(self.url)
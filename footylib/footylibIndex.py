@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: footylibIndex.py
+
+"""Lookup indexes over the crawled Footy state"""
+
+import heapq
+import bisect
+import threading
+import unicodedata
+from collections import defaultdict
+
+
+def normalize(name):
+    """
+    Normalizes a team name for lookups
+
+    Names are casefolded and stripped from accents so "cafe zurich"
+    finds "Café Zürich".
+    :param name: team name as bytes or string
+    :return: normalized string
+    """
+    if isinstance(name, bytes):
+        name = name.decode('utf-8')
+    decomposed = unicodedata.normalize('NFKD', name)
+    return ''.join(character for character in decomposed
+                   if not unicodedata.combining(character)).casefold()
+
+
+def ngrams(text, size):
+    """
+    :param text: normalized string
+    :param size: length of the n-grams
+    :return: set of all n-grams of exactly that length in text
+    """
+    return set(text[index:index + size]
+               for index in range(len(text) - size + 1))
+
+
+class TeamIndex(object):
+    """
+    Index of all teams across competitions
+
+    Exact lookups are a dictionary hit on the normalized name. Substring
+    lookups intersect the n-gram postings of the query and only verify
+    the few remaining candidates. Results keep the order of the
+    competitions and of the standings tables.
+    """
+    NGRAM = 3
+
+    def __init__(self, competitions=()):
+        """
+        :param competitions: iterable of Competition objects to index
+        """
+        self._lock = threading.Lock()
+        self._order = {}
+        self._entries = {}
+        self._exact = defaultdict(list)
+        self._ngrams = defaultdict(set)
+        self._by_competition = {}
+        for competition in competitions:
+            self.update(competition)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _grams(self, key):
+        grams = set()
+        for size in range(1, self.NGRAM + 1):
+            grams.update(ngrams(key, size))
+        return grams
+
+    def update(self, competition):
+        """
+        (Re)indexes the teams of one competition
+
+        Previous entries of the competition are dropped first, so this is
+        also how a refreshed competition is brought up to date.
+        :param competition: Competition object
+        """
+        teams = competition.teams
+        with self._lock:
+            self._remove(competition.url)
+            order = self._order.setdefault(competition.url, len(self._order))
+            entry_ids = []
+            for position, team in enumerate(teams):
+                entry_id = (order, position)
+                key = normalize(team.name)
+                self._entries[entry_id] = (key, team)
+                self._exact[key].append(entry_id)
+                self._exact[key].sort()
+                for gram in self._grams(key):
+                    self._ngrams[gram].add(entry_id)
+                entry_ids.append(entry_id)
+            self._by_competition[competition.url] = entry_ids
+
+    def remove(self, competition_url):
+        """
+        Drops all teams of a competition from the index
+
+        :param competition_url: url of the competition
+        """
+        with self._lock:
+            self._remove(competition_url)
+
+    def _remove(self, competition_url):
+        for entry_id in self._by_competition.pop(competition_url, []):
+            key, _ = self._entries.pop(entry_id)
+            self._exact[key].remove(entry_id)
+            if not self._exact[key]:
+                del self._exact[key]
+            for gram in self._grams(key):
+                self._ngrams[gram].discard(entry_id)
+                if not self._ngrams[gram]:
+                    del self._ngrams[gram]
+
+    def get(self, team_name):
+        """
+        :param team_name: exact team name, case and accents are ignored
+        :return: first matching Team object or None
+        """
+        key = normalize(team_name)
+        with self._lock:
+            entry_ids = self._exact.get(key)
+            if not entry_ids:
+                return None
+            return self._entries[entry_ids[0]][1]
+
+    def search(self, fragment):
+        """
+        :param fragment: part of a team name, case and accents are ignored
+        :return: list of Team objects whose name contains fragment
+        """
+        key = normalize(fragment)
+        with self._lock:
+            if not key:
+                candidates = set(self._entries)
+            elif len(key) <= self.NGRAM:
+                candidates = set(self._ngrams.get(key, ()))
+            else:
+                postings = sorted((self._ngrams.get(gram, set())
+                                   for gram in ngrams(key, self.NGRAM)),
+                                  key=len)
+                candidates = set(postings[0]).intersection(*postings[1:])
+            return [self._entries[entry_id][1]
+                    for entry_id in sorted(candidates)
+                    if key in self._entries[entry_id][0]]
+
+
+class MatchIndex(object):
+    """
+    Index of all matches across competitions
+
+    Kickoffs are kept in a sorted list, so time ranges are two bisects
+    and a slice. Locations, referees and divisions are hashed to the
+    matches they belong to. Queries combining both start from whichever
+    side has fewer candidates, so they run in time proportional to the
+    output rather than to the number of matches.
+    """
+    FIELDS = ('location', 'referee', 'division')
+
+    def __init__(self, competitions=()):
+        """
+        :param competitions: iterable of Competition objects to index
+        """
+        self._lock = threading.Lock()
+        self._order = {}
+        self._entries = {}
+        self._kickoffs = []
+        self._fields = dict((field, defaultdict(set))
+                            for field in self.FIELDS)
+        self._by_competition = {}
+        for competition in competitions:
+            self.update(competition)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _key(value):
+        return normalize(value or '').strip()
+
+    def update(self, competition):
+        """
+        (Re)indexes the matches of one competition
+
+        :param competition: Competition object
+        """
+        matches = competition.matches
+        division = competition.division
+        with self._lock:
+            self._remove(competition.url)
+            order = self._order.setdefault(competition.url, len(self._order))
+            entry_ids, kickoffs = [], []
+            for position, match in enumerate(matches):
+                entry_id = (order, position)
+                keys = {'location': self._key(match.location),
+                        'referee': self._key(match.referee),
+                        'division': self._key(division)}
+                self._entries[entry_id] = (match.datetime, keys, match)
+                if match.datetime is not None:
+                    kickoffs.append((match.datetime, entry_id))
+                for field, key in keys.items():
+                    self._fields[field][key].add(entry_id)
+                entry_ids.append(entry_id)
+            self._kickoffs = list(heapq.merge(self._kickoffs,
+                                              sorted(kickoffs)))
+            self._by_competition[competition.url] = entry_ids
+
+    def remove(self, competition_url):
+        """
+        Drops all matches of a competition from the index
+
+        :param competition_url: url of the competition
+        """
+        with self._lock:
+            self._remove(competition_url)
+
+    def _remove(self, competition_url):
+        entry_ids = self._by_competition.pop(competition_url, [])
+        if entry_ids:
+            order = self._order[competition_url]
+            self._kickoffs = [kickoff for kickoff in self._kickoffs
+                              if kickoff[1][0] != order]
+        for entry_id in entry_ids:
+            _, keys, _ = self._entries.pop(entry_id)
+            for field, key in keys.items():
+                self._fields[field][key].discard(entry_id)
+                if not self._fields[field][key]:
+                    del self._fields[field][key]
+
+    def query(self, start=None, end=None, **filters):
+        """
+        Matches with a kickoff in [start, end) and the given field values
+
+        :param start: earliest kickoff, datetime
+        :param end: kickoff to stop before, datetime
+        :param filters: location, referee and/or division, case and
+                        accents are ignored
+        :return: list of Match objects ordered by kickoff, matches
+                 without a kickoff last (only without start and end)
+        """
+        unknown = set(filters) - set(self.FIELDS)
+        if unknown:
+            raise ValueError('Cannot filter on {}'.format(
+                ', '.join(sorted(unknown))))
+        ranged = start is not None or end is not None
+        with self._lock:
+            postings = sorted((self._fields[field].get(self._key(value),
+                                                       set())
+                               for field, value in filters.items()), key=len)
+            candidates = None
+            if postings:
+                candidates = set(postings[0]).intersection(*postings[1:])
+            low, high = 0, len(self._kickoffs)
+            if start is not None:
+                low = bisect.bisect_left(self._kickoffs, (start,))
+            if end is not None:
+                high = bisect.bisect_left(self._kickoffs, (end,))
+            if candidates is None:
+                if ranged:
+                    return [self._entries[entry_id][2]
+                            for _, entry_id in self._kickoffs[low:high]]
+                candidates = set(self._entries)
+            if ranged and high - low < len(candidates):
+                return [self._entries[entry_id][2]
+                        for _, entry_id in self._kickoffs[low:high]
+                        if entry_id in candidates]
+            entries = []
+            for entry_id in candidates:
+                kickoff = self._entries[entry_id][0]
+                if ranged and (kickoff is None or
+                               (start is not None and kickoff < start) or
+                               (end is not None and kickoff >= end)):
+                    continue
+                # Matches without a kickoff only compare among themselves
+                entries.append((kickoff is None, kickoff or 0, entry_id))
+            return [self._entries[entry_id][2]
+                    for _, _, entry_id in sorted(entries)]
@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: footylibMetrics.py
+
+"""
+Instrumentation of the footylib hot paths
+
+Everything records into METRICS, which is disabled by default. While
+disabled, timers are a shared no-op and nothing is recorded, so the
+instrumented code paths only pay for a flag check.
+"""
+
+import time
+import bisect
+import logging
+import threading
+
+
+LOGGER_BASENAME = '''footylib'''
+LOGGER = logging.getLogger('{}.metrics'.format(LOGGER_BASENAME))
+LOGGER.addHandler(logging.NullHandler())
+
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5,
+                   1.0, 5.0, 10.0)
+
+
+class Histogram(object):
+    """
+    Cumulative histogram in the Prometheus sense
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """
+        :return: list of (upper bound, cumulative count), last is +Inf
+        """
+        total, result = 0, []
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class _NullTimer(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+class _Timer(object):
+
+    def __init__(self, metrics, name, labels):
+        self._metrics = metrics
+        self._name = name
+        self._labels = labels
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._metrics.observe(self._name, time.perf_counter() - self._start,
+                              **self._labels)
+        return False
+
+
+class Metrics(object):
+    """
+    Registry of counters and latency histograms
+
+    Hooks are called with (kind, name, value, labels) for every recorded
+    value, kind being 'counter' or 'histogram', so measurements can be
+    forwarded to any other monitoring system.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._hooks = []
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def add_hook(self, hook):
+        """
+        :param hook: callable taking (kind, name, value, labels)
+        """
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self._hooks.remove(hook)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def count(self, name, value=1, **labels):
+        """
+        Adds value to a counter
+
+        :param name: metric name
+        :param value: amount to add
+        :param labels: label names and values
+        """
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        for hook in self._hooks:
+            hook('counter', name, value, labels)
+
+    def observe(self, name, value, **labels):
+        """
+        Records a value in a histogram
+
+        :param name: metric name
+        :param value: observed value, seconds for latencies
+        :param labels: label names and values
+        """
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = Histogram()
+            self._histograms[key].observe(value)
+        for hook in self._hooks:
+            hook('histogram', name, value, labels)
+
+    def timer(self, name, **labels):
+        """
+        :param name: histogram name
+        :param labels: label names and values
+        :return: context manager that observes the seconds it took
+        """
+        if not self.enabled:
+            return NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def counter_value(self, name, **labels):
+        """
+        :return: current value of a counter
+        """
+        return self._counters.get(self._key(name, labels), 0)
+
+    def histogram(self, name, **labels):
+        """
+        :return: Histogram object or None
+        """
+        return self._histograms.get(self._key(name, labels))
+
+    def to_prometheus(self):
+        """
+        :return: all metrics in the Prometheus text exposition format
+        """
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+        current = None
+        for (name, labels), value in counters:
+            if name != current:
+                lines.append('# TYPE {} counter'.format(name))
+                current = name
+            lines.append('{}{} {}'.format(name, _labels(labels), value))
+        for (name, labels), histogram in histograms:
+            if name != current:
+                lines.append('# TYPE {} histogram'.format(name))
+                current = name
+            for bound, count in histogram.cumulative():
+                bucket = labels + (('le', '+Inf' if bound == float('inf')
+                                    else repr(bound)),)
+                lines.append('{}_bucket{} {}'.format(name, _labels(bucket),
+                                                     count))
+            lines.append('{}_sum{} {}'.format(name, _labels(labels),
+                                              histogram.sum))
+            lines.append('{}_count{} {}'.format(name, _labels(labels),
+                                                histogram.count))
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join('{}="{}"'.format(
+        name, str(value).replace('\\', '\\\\')
+                        .replace('"', '\\"')
+                        .replace('\n', '\\n'))
+        for name, value in labels) + '}'
+
+
+# Registry used by all instrumented code paths
+METRICS = Metrics()
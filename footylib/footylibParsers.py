@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: footylibParsers.py
+
+"""
+Parser backends that turn Footy pages into rows of cell texts
+
+BeautifulSoup is imported when a backend first parses a page, so loading
+a snapshot never pays for it.
+"""
+
+import logging
+from collections import namedtuple
+from html.parser import HTMLParser
+from .footylibExceptions import UnknownParserBackend
+
+
+LOGGER_BASENAME = '''footylib'''
+LOGGER = logging.getLogger('{}.parsers'.format(LOGGER_BASENAME))
+LOGGER.addHandler(logging.NullHandler())
+
+Section = namedtuple('Section', ['heading', 'rows'])
+
+
+class HtmlParserBackend(object):
+    """
+    Builds a full BeautifulSoup tree of the page with html.parser
+
+    Rows are extracted from the tree and the tree is dropped right after,
+    so only the cell texts outlive the call.
+    """
+    features = 'html.parser'
+
+    def _soup(self, html, parse_only=None):
+        from bs4 import BeautifulSoup as Bfs
+        return Bfs(html, self.features, parse_only=parse_only)
+
+    def competition_urls(self, html):
+        """
+        :param html: Footy front page
+        :return: list of competition urls in page order
+        """
+        from bs4 import SoupStrainer
+        league_page = self._soup(
+            html, SoupStrainer('div', {'id': 'league-page'})).find(
+            'div', {'id': 'league-page'})
+        urls = []
+        for competition in league_page.find_all('ul', {'class': 'sub-menu'}):
+            for competition_url in competition.find_all('a'):
+                url = competition_url.attrs.get('href')
+                if url:
+                    urls.append(url)
+        return urls
+
+    def _strainer(self, section_ids):
+        return None
+
+    def sections(self, html, section_ids):
+        """
+        :param html: competition page
+        :param section_ids: ids of the section tags to extract
+        :return: dictionary of section id to Section
+        """
+        soup = self._soup(html, self._strainer(section_ids))
+        sections = {}
+        for section_id in section_ids:
+            section = soup.find('section', {'id': section_id})
+            if section is not None:
+                sections[section_id] = self._section(section_id, section)
+        soup.decompose()
+        return sections
+
+    @staticmethod
+    def _section(section_id, section):
+        heading = section.h2.text if section.h2 else None
+        # Standings only come from the first table, matches from all rounds
+        if section_id == 'banner':
+            section = section.find('table')
+        rows = []
+        for row in section.find_all('tr') if section else []:
+            cells = row.find_all('td')
+            if cells:
+                rows.append(tuple(cell.text for cell in cells))
+        return Section(heading, rows)
+
+
+class LxmlBackend(HtmlParserBackend):
+    """
+    Builds a full BeautifulSoup tree with the C based lxml parser
+    """
+    features = 'lxml'
+
+    def __init__(self):
+        try:
+            import lxml
+        except ImportError:
+            raise UnknownParserBackend('lxml is not installed')
+        assert lxml
+
+
+class StrainedBackend(HtmlParserBackend):
+    """
+    Only builds the tree for the section tags that are needed
+    """
+
+    def _strainer(self, section_ids):
+        from bs4 import SoupStrainer
+        return SoupStrainer('section', {'id': list(section_ids)})
+
+
+class _RowExtractor(HTMLParser):
+    """
+    Event based extractor that collects section rows without a tree
+    """
+
+    def __init__(self, section_ids):
+        HTMLParser.__init__(self, convert_charrefs=True)
+        self._section_ids = set(section_ids)
+        self._section = None
+        self._depth = 0
+        self._tables = 0
+        self._heading = None
+        self._cells = None
+        self._text = None
+        self.headings = {}
+        self.rows = []
+
+    def handle_starttag(self, tag, attrs):
+        if self._section is None:
+            if tag == 'section':
+                section_id = dict(attrs).get('id')
+                if section_id in self._section_ids:
+                    self._section = section_id
+                    self._depth = 1
+                    self._tables = 0
+            return
+        if tag == 'section':
+            self._depth += 1
+        elif tag == 'table':
+            self._tables += 1
+        elif tag == 'h2' and self._section not in self.headings:
+            self._heading = []
+        elif self._wanted_table() and tag == 'tr':
+            self._cells = []
+        elif self._cells is not None and tag == 'td':
+            self._text = []
+
+    def handle_endtag(self, tag):
+        if self._section is None:
+            return
+        if tag == 'section':
+            self._depth -= 1
+            if not self._depth:
+                self._section = None
+        elif tag == 'h2' and self._heading is not None:
+            self.headings[self._section] = ''.join(self._heading)
+            self._heading = None
+        elif tag == 'td' and self._text is not None:
+            self._cells.append(''.join(self._text))
+            self._text = None
+        elif tag == 'tr' and self._cells is not None:
+            if self._cells:
+                self.rows.append((self._section, tuple(self._cells)))
+            self._cells = None
+
+    def handle_data(self, data):
+        if self._text is not None:
+            self._text.append(data)
+        if self._heading is not None:
+            self._heading.append(data)
+
+    def _wanted_table(self):
+        # Standings only come from the first table, matches from all rounds
+        return self._tables and (self._section != 'banner' or
+                                 self._tables == 1)
+
+
+class StreamingBackend(HtmlParserBackend):
+    """
+    Extracts rows while the page is fed through an event parser
+
+    No tree is ever built, rows are yielded as soon as their closing
+    tag has been seen.
+    """
+    chunk_size = 16384
+
+    def iter_rows(self, html, section_ids, headings=None):
+        """
+        :param html: competition page
+        :param section_ids: ids of the section tags to extract
+        :param headings: optional dictionary filled with the section headings
+        :return: generator of (section id, tuple of cell texts)
+        """
+        extractor = _RowExtractor(section_ids)
+        for start in range(0, len(html), self.chunk_size):
+            extractor.feed(html[start:start + self.chunk_size])
+            for row in extractor.rows:
+                yield row
+            del extractor.rows[:]
+        extractor.close()
+        for row in extractor.rows:
+            yield row
+        if headings is not None:
+            headings.update(extractor.headings)
+
+    def sections(self, html, section_ids):
+        headings = {}
+        rows = {}
+        for section_id, row in self.iter_rows(html, section_ids, headings):
+            rows.setdefault(section_id, []).append(row)
+        return {section_id: Section(headings.get(section_id),
+                                    rows.get(section_id, []))
+                for section_id in set(headings) | set(rows)}
+
+
+BACKENDS = {'html.parser': HtmlParserBackend,
+            'lxml': LxmlBackend,
+            'strained': StrainedBackend,
+            'streaming': StreamingBackend}
+
+
+def get_backend(backend):
+    """
+    :param backend: name of a backend in BACKENDS or a backend object
+    :return: backend object
+    """
+    if not isinstance(backend, str):
+        return backend
+    try:
+        return BACKENDS[backend]()
+    except KeyError:
+        raise UnknownParserBackend(
+            'choose one of {}'.format(', '.join(sorted(BACKENDS))))
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: footylibScheduler.py
+
+"""
+Kickoff-aware polling of competition pages
+
+A competition is refreshed right after one of its matches ends, every
+few minutes while a finished match is still waiting for its result, and
+only rarely otherwise. All refreshes share one request budget.
+"""
+
+import bisect
+import logging
+import threading
+from datetime import datetime, timedelta
+from collections import Counter
+from .footylibTransport import TokenBucket
+
+
+LOGGER_BASENAME = '''footylib'''
+LOGGER = logging.getLogger('{}.scheduler'.format(LOGGER_BASENAME))
+LOGGER.addHandler(logging.NullHandler())
+
+# Same duration as the events of FootyEvent
+MATCH_DURATION = timedelta(minutes=50)
+EPOCH = datetime(1970, 1, 1)
+
+
+class Scheduler(object):
+    """
+    Long-lived loop refreshing the competitions of a Footy object
+
+    Kickoffs are naive local times, so the clock has to return naive
+    local datetimes as well. Pass a fake clock and sleep to drive the
+    loop in tests.
+    """
+
+    def __init__(self, footy, budget=120, period=3600, live_interval=300,
+                 idle_interval=6 * 3600, result_window=timedelta(hours=3),
+                 on_changes=None, clock=datetime.now, sleep=None):
+        """
+        :param footy: Footy object
+        :param budget: competition refreshes allowed per period
+        :param period: seconds the budget is spread over
+        :param live_interval: seconds between refreshes while a finished
+                              match has no result yet
+        :param idle_interval: seconds between refreshes otherwise
+        :param result_window: how long after a match ended its result is
+                              polled for
+        :param on_changes: function called with the Changes of every
+                           refresh that found any
+        :param clock: function returning the current naive datetime
+        :param sleep: function sleeping for the given seconds, defaults to
+                      one that returns as soon as stop is called
+        """
+        self.footy = footy
+        self.live_interval = timedelta(seconds=live_interval)
+        self.idle_interval = timedelta(seconds=idle_interval)
+        self.result_window = result_window
+        self.on_changes = on_changes
+        self.stats = Counter()
+        self._clock = clock
+        self._stopped = threading.Event()
+        self._sleep = sleep or self._stopped.wait
+        self._bucket = TokenBucket(
+            float(budget) / period, budget,
+            clock=lambda: (self._clock() - EPOCH).total_seconds(),
+            sleep=self._sleep)
+        self._refreshed = {}
+        self._ends = {}
+
+    def _index(self, competition):
+        """
+        Sorts the end times of the matches of a competition
+
+        :param competition: Competition object
+        """
+        ends = sorted((match.datetime + MATCH_DURATION, position)
+                      for position, match in enumerate(competition.matches)
+                      if match.datetime is not None)
+        self._ends[competition.url] = ([end for end, _ in ends],
+                                       [competition.matches[position]
+                                        for _, position in ends])
+
+    def next_refresh(self, competition, now):
+        """
+        :param competition: Competition object
+        :param now: current datetime
+        :return: datetime the competition is due for a refresh
+        """
+        last = self._refreshed.get(competition.url)
+        if last is None:
+            return now
+        ends, matches = self._ends[competition.url]
+        # Matches that ended recently and still have no result
+        first = bisect.bisect_right(ends, now - self.result_window)
+        last_ended = bisect.bisect_right(ends, now)
+        if any(match.result is None
+               for match in matches[first:last_ended]):
+            return last + self.live_interval
+        due = last + self.idle_interval
+        # First match that ends after the last refresh
+        upcoming = bisect.bisect_right(ends, last)
+        if upcoming < len(ends):
+            due = min(due, ends[upcoming])
+        return max(due, last + self.live_interval)
+
+    def _refresh(self, competition):
+        waited = self._bucket.acquire()
+        if waited:
+            self.stats['throttled'] += 1
+        if self._stopped.is_set():
+            return
+        self.stats['refreshes'] += 1
+        try:
+            changes = competition.refresh()
+        except Exception:
+            self.stats['failures'] += 1
+            LOGGER.exception("Error while refreshing {}".format(
+                competition.url))
+            self._refreshed[competition.url] = self._clock()
+            # The matches of a competition that never loaded would be
+            # fetched again, keep the end times of the last refresh
+            self._ends.setdefault(competition.url, ([], []))
+            return
+        self._refreshed[competition.url] = self._clock()
+        self._index(competition)
+        if not changes:
+            return
+        self.stats['changes'] += 1
+        if self.on_changes:
+            self.on_changes(changes)
+
+    def run_once(self):
+        """
+        Refreshes the most overdue competition, if any is due
+
+        :return: seconds until the next competition is due
+        """
+        try:
+            competitions = self.footy.competitions
+        except Exception:
+            self.stats['failures'] += 1
+            LOGGER.exception("Error while retrieving the competitions")
+            return self.live_interval.total_seconds()
+        if not competitions:
+            return self.idle_interval.total_seconds()
+        now = self._clock()
+        due, position = min(
+            (self.next_refresh(competition, now), position)
+            for position, competition in enumerate(competitions))
+        if due <= now:
+            self._refresh(competitions[position])
+            now = self._clock()
+            due = min(self.next_refresh(competition, now)
+                      for competition in competitions)
+        return max(0, (due - now).total_seconds())
+
+    def run(self, until=None):
+        """
+        Polls until stop is called or the clock passes until
+
+        :param until: datetime to stop at, runs forever when omitted
+        """
+        self._stopped.clear()
+        while not self._stopped.is_set():
+            if until is not None and self._clock() >= until:
+                break
+            wait = self.run_once()
+            if until is not None:
+                wait = min(wait, max(0, (until - self._clock())
+                                     .total_seconds()))
+            if wait:
+                self._sleep(wait)
+
+    def stop(self):
+        """
+        Stops the loop after the refresh it is busy with
+        """
+        self._stopped.set()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: footylibSnapshot.py
+
+"""
+SQLite snapshots of the crawled Footy state
+
+A snapshot keeps the rows of every competition page as they were parsed,
+together with the parsed kickoffs and goals, so loading one needs neither
+a request, BeautifulSoup nor dateparser.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import tempfile
+import logging
+from datetime import datetime
+from .footylibParsers import Section
+
+
+LOGGER_BASENAME = '''footylib'''
+LOGGER = logging.getLogger('{}.snapshot'.format(LOGGER_BASENAME))
+LOGGER.addHandler(logging.NullHandler())
+
+SCHEMA_VERSION = 1
+SCHEMA = '''
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE competitions (position INTEGER PRIMARY KEY,
+                           url TEXT UNIQUE,
+                           division TEXT,
+                           matches_heading TEXT);
+CREATE TABLE teams (competition INTEGER,
+                    position INTEGER,
+                    row TEXT,
+                    PRIMARY KEY (competition, position));
+CREATE TABLE matches (competition INTEGER,
+                      position INTEGER,
+                      row TEXT,
+                      kickoff TEXT,
+                      home_team_goals TEXT,
+                      visiting_team_goals TEXT,
+                      PRIMARY KEY (competition, position));
+'''
+
+
+def _goals(match):
+    try:
+        return match.home_team_goals, match.visiting_team_goals
+    except ValueError:
+        return None, None
+
+
+def save(footy, path):
+    """
+    Writes a snapshot, replacing whatever was in path
+
+    Every competition is loaded before the file is touched and the
+    snapshot is written next to it and moved in place, so a failed save
+    leaves the previous snapshot as it was.
+    :param footy: Footy object
+    :param path: path of the snapshot file
+    """
+    competitions = [competition._load() for competition in footy.competitions]
+    handle, temporary = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    os.close(handle)
+    try:
+        connection = sqlite3.connect(temporary)
+        try:
+            with connection:
+                connection.executescript(SCHEMA)
+                connection.executemany(
+                    'INSERT INTO meta VALUES (?, ?)',
+                    [('version', str(SCHEMA_VERSION)),
+                     ('site', footy._site),
+                     ('saved_at', str(time.time()))])
+                for position, competition in enumerate(competitions):
+                    _insert(connection, position, competition)
+        finally:
+            connection.close()
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+    LOGGER.info("Saved snapshot of {} competitions to {}".format(
+        len(competitions), path))
+
+
+def _insert(connection, position, competition):
+    """
+    :param connection: sqlite3 connection in a transaction
+    :param position: position of the competition on the league page
+    :param competition: loaded Competition object
+    """
+    standings = competition._get_table('banner')
+    matches = competition._get_table('previous-matches')
+    connection.execute(
+        'INSERT INTO competitions VALUES (?, ?, ?, ?)',
+        (position, competition.url, standings.heading, matches.heading))
+    connection.executemany(
+        'INSERT INTO teams VALUES (?, ?, ?)',
+        [(position, index, json.dumps(row))
+         for index, row in enumerate(standings.rows)])
+    connection.executemany(
+        'INSERT INTO matches VALUES (?, ?, ?, ?, ?, ?)',
+        [(position, index, json.dumps(row),
+          match.datetime.isoformat() if match.datetime else None)
+         + _goals(match)
+         for index, (row, match) in enumerate(
+            zip(matches.rows, competition.matches))])
+
+
+def load(footy, path):
+    """
+    Fills a Footy object with the competitions stored in a snapshot
+
+    :param footy: Footy object without any competitions
+    :param path: path of the snapshot file
+    """
+    from .footylib import Competition, Team, Match
+    connection = sqlite3.connect(path)
+    try:
+        version = connection.execute(
+            "SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if not version or int(version[0]) != SCHEMA_VERSION:
+            raise ValueError('{} is not a footylib snapshot version {}'.format(
+                path, SCHEMA_VERSION))
+        teams = {}
+        for position, row in connection.execute(
+                'SELECT competition, row FROM teams '
+                'ORDER BY competition, position'):
+            teams.setdefault(position, []).append(tuple(json.loads(row)))
+        matches = {}
+        for record in connection.execute(
+                'SELECT competition, row, kickoff, home_team_goals, '
+                'visiting_team_goals FROM matches '
+                'ORDER BY competition, position'):
+            matches.setdefault(record[0], []).append(record[1:])
+        competitions = connection.execute(
+            'SELECT position, url, division, matches_heading '
+            'FROM competitions ORDER BY position').fetchall()
+    finally:
+        connection.close()
+
+    for position, url, division, matches_heading in competitions:
+        competition = Competition(footy, url)
+        match_rows = []
+        for row, kickoff, home_goals, visiting_goals in matches.get(position,
+                                                                    []):
+            row = tuple(json.loads(row))
+            kickoff = datetime.fromisoformat(kickoff) if kickoff else None
+            match = Match(competition, row, kickoff=kickoff)
+            match._home_team_goals = home_goals
+            match._visiting_team_goals = visiting_goals
+            competition._matches.append(match)
+            match_rows.append(row)
+        team_rows = teams.get(position, [])
+        competition._sections = {
+            'banner': Section(division, team_rows),
+            'previous-matches': Section(matches_heading, match_rows)}
+        competition._teams = [Team(competition, row, division)
+                              for row in team_rows]
+        competition._index_teams()
+        competition._index_matches()
+        footy._competitions.append(competition)
+        footy._urls.add(url)
+    LOGGER.info("Loaded snapshot of {} competitions from {}".format(
+        len(competitions), path))
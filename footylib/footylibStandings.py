@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: footylibStandings.py
+
+"""
+Standings computed from the match results
+
+The matches of all given competitions are loaded once into NumPy arrays,
+after which tables, home/away splits and form are computed in vectorized
+passes over all competitions at the same time. NumPy is imported when an
+engine is first built (``pip install footylib[numpy]``).
+"""
+
+import logging
+from collections import namedtuple
+from .footylibExceptions import MissingOptionalDependency
+
+
+LOGGER_BASENAME = '''footylib'''
+LOGGER = logging.getLogger('{}.standings'.format(LOGGER_BASENAME))
+LOGGER.addHandler(logging.NullHandler())
+
+VENUES = ('all', 'home', 'away')
+
+StandingsRow = namedtuple('StandingsRow', ['competition',
+                                           'position',
+                                           'name',
+                                           'played_games',
+                                           'won_games',
+                                           'tie_games',
+                                           'lost_games',
+                                           'goals_for',
+                                           'goals_against',
+                                           'diff',
+                                           'points'])
+
+Discrepancy = namedtuple('Discrepancy', ['competition',
+                                         'name',
+                                         'field',
+                                         'scraped',
+                                         'computed'])
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise MissingOptionalDependency('numpy is needed for the standings')
+    return numpy
+
+
+def _scraped_number(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _scraped_goals(value):
+    goals_for, _, goals_against = (value or '').partition('-')
+    return _scraped_number(goals_for), _scraped_number(goals_against)
+
+
+class StandingsEngine(object):
+    """
+    League tables of one or more competitions
+
+    Teams are identified by their position in ``teams``, a list of
+    (Competition, team name) tuples. Teams that only show up in the
+    matches are added after the teams of the standings table.
+    """
+
+    def __init__(self, competitions, points_win=3, points_draw=1):
+        """
+        :param competitions: iterable of Competition objects
+        :param points_win: points for a won match
+        :param points_draw: points for a tie
+        """
+        np = _numpy()
+        self.points_win = points_win
+        self.points_draw = points_draw
+        self.competitions = list(competitions)
+        self.teams = []
+        self._ids = ids = {}
+        team_competition = []
+        competition, home, away = [], [], []
+        home_goals, away_goals, played, kickoff = [], [], [], []
+
+        def team_id(position, name):
+            key = (position, name)
+            if key not in ids:
+                ids[key] = len(self.teams)
+                self.teams.append((self.competitions[position], name))
+                team_competition.append(position)
+            return ids[key]
+
+        for position, instance in enumerate(self.competitions):
+            for team in instance.teams:
+                team_id(position, team.name)
+            for match in instance.matches:
+                home_name, visiting_name = match.team_names
+                result = match.result
+                competition.append(position)
+                home.append(team_id(position, home_name))
+                away.append(team_id(position, visiting_name))
+                home_goals.append(result[0] if result else 0)
+                away_goals.append(result[1] if result else 0)
+                played.append(result is not None)
+                kickoff.append(match.datetime)
+
+        self.team_competition = np.array(team_competition, dtype=np.intp)
+        self.competition = np.array(competition, dtype=np.intp)
+        self.home = np.array(home, dtype=np.intp)
+        self.away = np.array(away, dtype=np.intp)
+        self.home_goals = np.array(home_goals, dtype=np.int64)
+        self.away_goals = np.array(away_goals, dtype=np.int64)
+        self.played = np.array(played, dtype=bool)
+        self.kickoff = np.array(kickoff, dtype='datetime64[s]')
+        LOGGER.debug("Loaded {} matches of {} teams".format(
+            len(self.home), len(self.teams)))
+
+    def _appearances(self, venue='all'):
+        """
+        One entry per team per played match
+
+        :param venue: 'all', 'home' or 'away'
+        :return: tuple of match, team, goals for and goals against arrays
+        """
+        if venue not in VENUES:
+            raise ValueError('venue must be one of {}'.format(VENUES))
+        np = _numpy()
+        matches = np.flatnonzero(self.played)
+        sides = []
+        if venue in ('all', 'home'):
+            sides.append((matches, self.home[matches],
+                          self.home_goals[matches], self.away_goals[matches]))
+        if venue in ('all', 'away'):
+            sides.append((matches, self.away[matches],
+                          self.away_goals[matches], self.home_goals[matches]))
+        return tuple(np.concatenate(columns) for columns in zip(*sides))
+
+    def totals(self, venue='all'):
+        """
+        :param venue: 'all', 'home' or 'away'
+        :return: dict of arrays indexed by team id with the keys played,
+                 won, tie, lost, goals_for, goals_against, diff and points
+        """
+        np = _numpy()
+        size = len(self.teams)
+        _, team, goals_for, goals_against = self._appearances(venue)
+        won = np.bincount(team[goals_for > goals_against], minlength=size)
+        tie = np.bincount(team[goals_for == goals_against], minlength=size)
+        scored = np.bincount(team, weights=goals_for,
+                             minlength=size).astype(np.int64)
+        conceded = np.bincount(team, weights=goals_against,
+                               minlength=size).astype(np.int64)
+        return {'played': np.bincount(team, minlength=size),
+                'won': won,
+                'tie': tie,
+                'lost': np.bincount(team[goals_for < goals_against],
+                                    minlength=size),
+                'goals_for': scored,
+                'goals_against': conceded,
+                'diff': scored - conceded,
+                'points': won * self.points_win + tie * self.points_draw}
+
+    def ranking(self, venue='all'):
+        """
+        :param venue: 'all', 'home' or 'away'
+        :return: tuple of team ids sorted by competition, points, goal
+                 difference and goals scored, and the totals they were
+                 sorted by
+        """
+        np = _numpy()
+        totals = self.totals(venue)
+        # lexsort sorts on the last key first
+        order = np.lexsort((np.arange(len(self.teams)),
+                            -totals['goals_for'],
+                            -totals['diff'],
+                            -totals['points'],
+                            self.team_competition))
+        return order, totals
+
+    def _positions(self, order):
+        """
+        :param order: team ids as returned by ranking
+        :return: array with the table position of every entry of order
+        """
+        np = _numpy()
+        competition = self.team_competition[order]
+        starts = np.flatnonzero(
+            np.r_[True, competition[1:] != competition[:-1]])
+        sizes = np.diff(np.r_[starts, len(order)])
+        return np.arange(len(order)) - np.repeat(starts, sizes) + 1
+
+    def table(self, venue='all'):
+        """
+        :param venue: 'all', 'home' or 'away'
+        :return: list of StandingsRow of all competitions, in order
+        """
+        order, totals = self.ranking(venue)
+        positions = self._positions(order)
+        columns = [totals[key][order].tolist()
+                   for key in ('played', 'won', 'tie', 'lost', 'goals_for',
+                               'goals_against', 'diff', 'points')]
+        return [StandingsRow(self.teams[team][0], position,
+                             self.teams[team][1], *values)
+                for team, position, values in zip(order.tolist(),
+                                                  positions.tolist(),
+                                                  zip(*columns))]
+
+    def form(self, last=5, venue='all'):
+        """
+        Results of the last played matches of every team
+
+        Matches without a kickoff are taken as the oldest ones.
+        :param last: number of matches to take
+        :param venue: 'all', 'home' or 'away'
+        :return: dict of team id to a string like 'WDLWW', oldest first
+        """
+        np = _numpy()
+        match, team, goals_for, goals_against = self._appearances(venue)
+        kickoff = self.kickoff[match].astype(np.int64)
+        order = np.lexsort((match, kickoff, team))
+        team = team[order]
+        outcome = np.sign(goals_for - goals_against)[order]
+        counts = np.bincount(team, minlength=len(self.teams))
+        ends = np.cumsum(counts)
+        remaining = ends[team] - np.arange(len(team))
+        recent = remaining <= last
+        letters = np.array(['L', 'D', 'W'])[outcome[recent] + 1]
+        form = dict.fromkeys(range(len(self.teams)), '')
+        for team_id, letter in zip(team[recent].tolist(), letters.tolist()):
+            form[team_id] += letter
+        return form
+
+    def check(self):
+        """
+        Compares the computed table with the scraped standings
+
+        :return: list of Discrepancy, empty when both agree
+        """
+        np = _numpy()
+        order, totals = self.ranking()
+        positions = np.empty(len(order), dtype=np.int64)
+        positions[order] = self._positions(order)
+        fields = (('position', positions,
+                   lambda team: _scraped_number(team.position)),
+                  ('played_games', totals['played'],
+                   lambda team: _scraped_number(team.played_games)),
+                  ('won_games', totals['won'],
+                   lambda team: _scraped_number(team.won_games)),
+                  ('tie_games', totals['tie'],
+                   lambda team: _scraped_number(team.tie_games)),
+                  ('lost_games', totals['lost'],
+                   lambda team: _scraped_number(team.lost_games)),
+                  ('goals_for', totals['goals_for'],
+                   lambda team: _scraped_goals(team.goals)[0]),
+                  ('goals_against', totals['goals_against'],
+                   lambda team: _scraped_goals(team.goals)[1]),
+                  ('diff', totals['diff'],
+                   lambda team: _scraped_number(team.diff)),
+                  ('points', totals['points'],
+                   lambda team: _scraped_number(team.points)))
+        ids, scraped_teams = [], []
+        for position, instance in enumerate(self.competitions):
+            for team in instance.teams:
+                ids.append(self._ids[(position, team.name)])
+                scraped_teams.append(team)
+        ids = np.array(ids, dtype=np.intp)
+        discrepancies = []
+        for field, computed, scrape in fields:
+            scraped = np.array([scrape(team) for team in scraped_teams],
+                               dtype=float)
+            differs = ~np.isnan(scraped) & (scraped != computed[ids])
+            for index in np.flatnonzero(differs).tolist():
+                team_id = ids[index]
+                discrepancies.append(Discrepancy(
+                    self.teams[team_id][0], self.teams[team_id][1], field,
+                    int(scraped[index]), int(computed[team_id])))
+        return discrepancies
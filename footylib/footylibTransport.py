@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: footylibTransport.py
+
+"""HTTP transport for Footy: pooling, timeouts, retries and rate limiting"""
+
+import time
+import random
+import logging
+import threading
+from collections import Counter
+from urllib.parse import urlparse
+from .footylibExceptions import ErrorFetchingPage
+
+
+LOGGER_BASENAME = '''footylib'''
+LOGGER = logging.getLogger('{}.transport'.format(LOGGER_BASENAME))
+LOGGER.addHandler(logging.NullHandler())
+
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+DEFAULT_HEADERS = {'User-Agent': 'Mozilla/5.0',
+                   'Accept-Encoding': 'gzip, deflate',
+                   'Connection': 'keep-alive'}
+
+
+def _retry_exceptions():
+    """
+    :return: tuple of the requests exceptions that are worth a retry
+    """
+    from requests import exceptions
+    return (exceptions.ConnectionError,
+            exceptions.Timeout,
+            exceptions.ChunkedEncodingError)
+
+
+class TokenBucket(object):
+    """
+    Token bucket rate limiter
+
+    Callers reserve a token and sleep outside the lock until it is due,
+    so concurrent callers are spaced out instead of woken all at once.
+    """
+
+    def __init__(self, rate, capacity=1, clock=time.monotonic,
+                 sleep=time.sleep):
+        """
+        :param rate: tokens added per second
+        :param capacity: maximum burst of tokens
+        :param clock: function returning seconds
+        :param sleep: function sleeping for the given seconds
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Takes a token, waiting until one is available
+
+        :return: seconds waited
+        """
+        with self._lock:
+            now = self._clock()
+            refill = (now - self._updated) * self.rate
+            self._tokens = min(self.capacity, self._tokens + refill)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait:
+            self._sleep(wait)
+        return wait
+
+
+class Transport(object):
+    """
+    Sends the requests of a Footy object
+
+    A single requests Session is shared by all threads, with connection
+    pools sized for them. It is created on the first request, so
+    requests is not imported until a page is actually fetched. Every
+    request has explicit connect and read timeouts, is capped in
+    concurrency per host, is throttled by a token bucket only when a rate
+    is given, and is retried with jittered exponential backoff on
+    connection errors, timeouts and 429/5xx answers.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10,
+                 connect_timeout=5, read_timeout=30, retries=3,
+                 backoff=0.5, backoff_max=30, rate=None, burst=10,
+                 max_per_host=4, headers=None, sleep=time.sleep):
+        """
+        :param pool_connections: number of hosts to keep pools for
+        :param pool_maxsize: connections kept alive per host
+        :param connect_timeout: seconds to wait for a connection
+        :param read_timeout: seconds to wait for data
+        :param retries: retries after the first attempt
+        :param backoff: base seconds of the exponential backoff
+        :param backoff_max: upper bound of a single backoff
+        :param rate: requests per second per host, None (default) for no limit
+        :param burst: requests per host that may go out at once
+        :param max_per_host: maximum concurrent requests against one host
+        :param headers: extra headers sent with every request
+        :param sleep: function sleeping for the given seconds
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.rate = rate
+        self.burst = burst
+        self.max_per_host = max_per_host
+        self.stats = Counter()
+        self._sleep = sleep
+        self._hosts = {}
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._pool_connections = pool_connections
+        self._pool_maxsize = pool_maxsize
+        self.headers = dict(DEFAULT_HEADERS, **(headers or {}))
+        self._session = None
+
+    @property
+    def session(self):
+        """
+        :return: requests Session, created on first use
+        """
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    from requests import Session
+                    from requests.adapters import HTTPAdapter
+                    session = Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=self._pool_connections,
+                        pool_maxsize=self._pool_maxsize,
+                        pool_block=True)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    session.headers.update(self.headers)
+                    self._session = session
+        return self._session
+
+    @session.setter
+    def session(self, session):
+        self._session = session
+
+    def _host(self, url):
+        """
+        :param url: url that is about to be requested
+        :return: tuple of BoundedSemaphore and TokenBucket (or None)
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._hosts:
+                bucket = None
+                if self.rate:
+                    bucket = TokenBucket(self.rate, self.burst,
+                                         sleep=self._sleep)
+                self._hosts[host] = (
+                    threading.BoundedSemaphore(self.max_per_host), bucket)
+        return self._hosts[host]
+
+    def _count(self, name, value=1):
+        with self._stats_lock:
+            self.stats[name] += value
+
+    def _backoff(self, attempt, response=None):
+        delay = random.uniform(0, min(self.backoff_max,
+                                      self.backoff * 2 ** attempt))
+        retry_after = response.headers.get('Retry-After') \
+            if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(self.backoff_max, int(retry_after)))
+        self._sleep(delay)
+
+    def get(self, url, headers=None):
+        """
+        :param url: url to retrieve
+        :param headers: extra headers for this request
+        :return: Response object with a status below 400
+        """
+        semaphore, bucket = self._host(url)
+        session = self.session
+        retry_exceptions = _retry_exceptions()
+        for attempt in range(self.retries + 1):
+            response, error = None, None
+            with semaphore:
+                waited = bucket.acquire() if bucket else 0
+                if waited:
+                    self._count('throttled')
+                    self._count('throttled_seconds', waited)
+                self._count('requests')
+                try:
+                    response = session.get(url, headers=headers,
+                                           timeout=self.timeout)
+                except retry_exceptions as exception:
+                    error = exception
+            if error is None and response.status_code not in RETRY_STATUSES:
+                break
+            if attempt < self.retries:
+                self._count('retries')
+                LOGGER.warning("Retrying {} after {}".format(
+                    url, error or response.status_code))
+                self._backoff(attempt, response)
+        if error is not None or response.status_code >= 400:
+            self._count('failures')
+            raise ErrorFetchingPage(url, error or response.status_code)
+        return response
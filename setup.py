@@ -26,7 +26,19 @@ setup(
     package_dir={'footylib':
                  'footylib'},
     include_package_data=True,
+    python_requires='>=3.7',
     install_requires=requirements,
+    extras_require={
+        'lxml': ['lxml'],
+        'async': ['aiohttp'],
+        'numpy': ['numpy'],
+        'test': ['pytest', 'aiohttp'],
+    },
+    entry_points={
+        'console_scripts': [
+            'footylib = footylib.footylibCli:main',
+        ],
+    },
     license="Apache-2.0",
     zip_safe=False,
     keywords='footylib',
@@ -34,7 +46,13 @@ setup(
         'Development Status :: 5 - Production/Stable',
         'License :: OSI Approved :: Apache Software License',
         'Natural Language :: English',
-        'Programming Language :: Python :: 2.7',
+        'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3 :: Only',
+        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
     ],
     data_files=[
         ('', [
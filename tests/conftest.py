@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+# File: conftest.py
+
+"""
+Stand-in Footy site for the tests
+
+Pages are built from plain standings and match rows and served by a
+stand-in for the requests Session, or over HTTP on localhost, so no
+request reaches footy.eu.
+"""
+
+import time
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import footylib
+from footylib import Transport
+
+BASE = 'https://www.footy.eu'
+LAST_MODIFIED = 'Tue, 05 Sep 2017 20:30:00 GMT'
+
+
+def standings_row(position, name, points=0, played=0):
+    return [position, name, played, 0, 0, 0, '0-0', 0, points]
+
+
+def match_row(kickoff, title, score='-:-', location='Veld 1',
+              referee='Ref', info='Info'):
+    return [kickoff, location, title, score, referee, 'Player', info]
+
+
+def _cells(row):
+    return '<tr>{}</tr>'.format(''.join('<td>{}</td>'.format(cell)
+                                        for cell in row))
+
+
+def front_page(urls):
+    return ('<html><body><div id="league-page"><ul class="sub-menu">{}'
+            '<li><a href="#top">top</a></li></ul></div></body></html>'
+            ).format(''.join('<li><a href="{0}">{0}</a></li>'.format(url)
+                             for url in urls))
+
+
+def competition_page(division, teams, matches):
+    return ('<html><body><section id="banner"><h2>{}</h2><table>'
+            '<tr><th>#</th></tr>{}</table></section>'
+            '<section id="previous-matches"><table><tr><th>Datum</th></tr>'
+            '{}</table></section></body></html>'
+            ).format(division, ''.join(_cells(row) for row in teams),
+                     ''.join(_cells(row) for row in matches))
+
+
+class Response(object):
+
+    def __init__(self, text, status_code=200, headers=None):
+        self.text = text
+        self.content = text.encode('utf-8')
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise IOError(self.status_code)
+
+
+class Site(object):
+    """
+    Pages of the stand-in site, keyed by url
+
+    Also stands in for the requests Session of a Footy object.
+    """
+
+    def __init__(self, base=BASE):
+        self.base = base
+        self.url = '{}/schemas-standen/'.format(base)
+        self.pages = {}
+        self.delays = {}
+        self.calls = []
+        self.sent_headers = []
+        self.headers = {}
+
+    def competition(self, slug, division, teams, matches):
+        """
+        Adds or replaces a competition page
+
+        :return: url of the competition
+        """
+        url = '{}/competition/{}/'.format(self.base, slug)
+        self.pages[url] = competition_page(division, teams, matches)
+        self.pages[self.url] = front_page(sorted(
+            url for url in self.pages if url != self.url))
+        return url
+
+    def missing(self, slug):
+        """
+        Links a competition whose page is not found
+
+        :return: url of the competition
+        """
+        url = '{}/competition/{}/'.format(self.base, slug)
+        self.pages[self.url] = front_page(sorted(
+            [url] + [url for url in self.pages if url != self.url]))
+        return url
+
+    def get(self, url, headers=None, **kwargs):
+        """
+        Serves a page with an ETag, 304 when the ETag still matches and
+        404 when there is no page
+        """
+        self.calls.append(url)
+        self.sent_headers.append(dict(headers or {}))
+        time.sleep(self.delays.get(url, 0))
+        page = self.pages.get(url)
+        if page is None:
+            return Response('', 404)
+        etag = '"{}"'.format(hashlib.sha1(page.encode('utf-8')).hexdigest())
+        if (headers or {}).get('If-None-Match') == etag:
+            return Response('', 304, {'ETag': etag})
+        return Response(page, headers={'ETag': etag,
+                                       'Last-Modified': LAST_MODIFIED})
+
+    def footy(self, **kwargs):
+        """
+        :return: Footy object crawling this site
+        """
+        kwargs.setdefault('transport', Transport(rate=None))
+        footy = footylib.Footy(**kwargs)
+        footy._session = self
+        footy._site = self.url
+        return footy
+
+
+class Handler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        site = self.server.site
+        url = site.base + self.path
+        site.calls.append(url)
+        time.sleep(site.delays.get(url, 0))
+        page = site.pages.get(url)
+        if page is None:
+            self.send_error(404)
+            return
+        body = page.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def site():
+    return Site()
+
+
+@pytest.fixture
+def server():
+    """
+    Site served over HTTP on localhost
+    """
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    httpd.daemon_threads = True
+    httpd.site = Site('http://127.0.0.1:{}'.format(httpd.server_port))
+    thread = threading.Thread(target=httpd.serve_forever)
+    thread.start()
+    yield httpd.site
+    httpd.shutdown()
+    httpd.server_close()
+    thread.join()
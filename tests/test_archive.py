@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# File: test_archive.py
+
+import os
+import json
+
+from footylib import Archive
+from footylib.footylibArchive import INDEX_FILE, DIGESTS_FILE
+
+from conftest import standings_row, match_row
+
+SEASON = '2017-2018'
+TEAMS = [standings_row(1, 'Ajax'),
+         standings_row(2, 'Bravo')]
+MATCHES = [match_row('05.09.2017 20:30', 'Ajax - Bravo', score='2 - 1')]
+
+
+def crawl(site, teams=TEAMS, matches=MATCHES):
+    site.competition('first', 'First division', teams, matches)
+    return site.footy().competitions
+
+
+def test_unchanged_records_are_skipped(site, tmpdir):
+    archive = Archive(str(tmpdir))
+
+    assert archive.append(crawl(site), crawled_at=1) == 3
+    assert archive.append(crawl(site), crawled_at=2) == 0
+    teams = [standings_row(1, 'Ajax', points=3, played=1),
+             standings_row(2, 'Bravo', played=1)]
+    assert archive.append(crawl(site, teams), crawled_at=3) == 3
+
+    assert archive.seasons() == [SEASON]
+    assert [record['crawled_at']
+            for _, record in archive.history('ajax')] == [1, 3]
+    url = '{}/competition/first/'.format(site.base)
+    record = archive.competition(url, SEASON)
+    assert record['teams'][0][-1] == '3'
+    assert [(match.home_team, match.home_team_goals)
+            for match in archive.results('Bravo')] == [('Ajax', 2)]
+
+
+def test_digests_are_kept_out_of_the_index(site, tmpdir):
+    archive = Archive(str(tmpdir))
+
+    archive.append(crawl(site), crawled_at=1)
+
+    with open(os.path.join(str(tmpdir), SEASON, INDEX_FILE)) as index:
+        assert 'digests' not in json.load(index)
+    with open(os.path.join(str(tmpdir), SEASON, DIGESTS_FILE)) as digests:
+        assert len(json.load(digests)) == 3
+
+
+def test_digests_of_an_older_index_are_moved_out(site, tmpdir):
+    archive = Archive(str(tmpdir))
+    archive.append(crawl(site), crawled_at=1)
+    path = os.path.join(str(tmpdir), SEASON)
+    with open(os.path.join(path, INDEX_FILE)) as index:
+        content = json.load(index)
+    with open(os.path.join(path, DIGESTS_FILE)) as digests:
+        content['digests'] = json.load(digests)
+    with open(os.path.join(path, INDEX_FILE), 'w') as index:
+        json.dump(content, index)
+    os.remove(os.path.join(path, DIGESTS_FILE))
+
+    assert archive.append(crawl(site), crawled_at=2) == 0
+
+    with open(os.path.join(path, INDEX_FILE)) as index:
+        assert 'digests' not in json.load(index)
+    assert os.path.isfile(os.path.join(path, DIGESTS_FILE))
+
+
+def test_teams_with_the_same_name_stay_apart(site, tmpdir):
+    archive = Archive(str(tmpdir))
+    teams = [standings_row(1, 'Ajax', points=3),
+             standings_row(2, 'Ajax', points=1)]
+
+    assert archive.append(crawl(site, teams), crawled_at=1) == 3
+    assert archive.append(crawl(site, teams), crawled_at=2) == 0
+    assert sorted(record['team'][-1]
+                  for record in archive._latest(SEASON, 'teams',
+                                                'ajax')) == ['1', '3']
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# File: test_async.py
+
+import asyncio
+
+import pytest
+
+import footylib
+from footylib import AsyncFooty, Transport, BlockingFetchOnEventLoop
+from conftest import standings_row, match_row
+
+aiohttp = pytest.importorskip('aiohttp')
+
+
+def populate(site, competitions=3):
+    for number in range(competitions):
+        teams = [standings_row(position, 'Team {}{}'.format(number, position))
+                 for position in range(1, 5)]
+        matches = [match_row('{:02d}.09.2017 20:30'.format(day + 1),
+                             '{} - {}'.format(home[1], visiting[1]),
+                             score='{} - {}'.format(day % 3, day % 2)
+                             if day % 2 else '-:-')
+                   for day, (home, visiting) in enumerate(
+                       (home, visiting) for home in teams
+                       for visiting in teams if home != visiting)]
+        site.competition('division-{}'.format(number),
+                         'Division {}'.format(number), teams, matches)
+
+
+def summary(competitions):
+    return [(competition.url,
+             competition.division,
+             [(team.name, team.points) for team in competition.teams],
+             [(match.title, match.datetime, match.score)
+              for match in competition.matches])
+            for competition in competitions]
+
+
+def test_async_footy_matches_footy(server):
+    populate(server)
+    footy = footylib.Footy(transport=Transport(rate=None))
+    footy._site = server.url
+
+    # Built outside the loop it runs on, like a module level client
+    async_footy = AsyncFooty(site=server.url)
+
+    async def crawl():
+        async with async_footy:
+            competitions = await async_footy.prefetch()
+            team = await async_footy.get_team('team 12')
+            found = await async_footy.search_team('team 2')
+            return ([competition.competition for competition in competitions],
+                    team, found)
+
+    competitions, team, found = asyncio.run(crawl())
+
+    assert len(competitions) == 3
+    assert summary(competitions) == summary(footy.competitions)
+    assert team.name == footy.get_team('team 12').name == b'Team 12'
+    assert ([team.name for team in found] ==
+            [team.name for team in footy.search_team('team 2')])
+
+
+def test_failed_page_cancels_the_others(server):
+    populate(server, competitions=2)
+    for url in list(server.pages):
+        if url != server.url:
+            server.delays[url] = 0.5
+    server.missing('gone')
+
+    async def crawl():
+        async with AsyncFooty(site=server.url) as async_footy:
+            with pytest.raises(aiohttp.ClientResponseError) as error:
+                await async_footy.prefetch()
+            assert error.value.status == 404
+            pending = [task for task in asyncio.all_tasks()
+                       if task is not asyncio.current_task()]
+            with pytest.raises(BlockingFetchOnEventLoop):
+                async_footy.footy.get_team('team 01')
+            return pending
+
+    assert asyncio.run(crawl()) == []
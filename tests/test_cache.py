@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# File: test_cache.py
+
+import os
+
+from footylib import MemoryCache, FileCache
+from conftest import standings_row, match_row, LAST_MODIFIED
+
+
+def page(site, location='Veld 1'):
+    return site.competition('first', 'First division',
+                            [standings_row(1, 'Ajax')],
+                            [match_row('05.09.2017 20:30', 'Ajax - Bravo',
+                                       location=location)])
+
+
+def test_stale_entry_is_revalidated_and_reused_on_304(site):
+    url = page(site)
+    cache = MemoryCache(ttl=0)
+    footy = site.footy(cache=cache)
+
+    body = footy._fetch(url)
+    stored = cache.get(url)
+    again = footy._fetch(url)
+
+    assert site.sent_headers[0] == {}
+    assert site.sent_headers[1] == {'If-None-Match': stored.etag,
+                                    'If-Modified-Since': LAST_MODIFIED}
+    assert again == body == site.pages[url]
+    assert cache.get(url).body == body
+    assert cache.get(url).stored_at >= stored.stored_at
+
+
+def test_changed_page_replaces_the_entry(site):
+    url = page(site)
+    cache = MemoryCache(ttl=0)
+    footy = site.footy(cache=cache)
+    footy._fetch(url)
+    etag = cache.get(url).etag
+
+    page(site, location='Veld 2')
+    body = footy._fetch(url)
+
+    assert 'Veld 2' in body
+    assert cache.get(url).body == body
+    assert cache.get(url).etag != etag
+
+
+def test_fresh_entry_is_served_without_a_request(site):
+    url = page(site)
+    footy = site.footy(cache=MemoryCache(ttl=300))
+
+    footy._fetch(url)
+    footy._fetch(url)
+    assert site.calls == [url]
+
+    footy._fetch(url, revalidate=True)
+    assert site.calls == [url, url]
+    assert 'If-None-Match' in site.sent_headers[1]
+
+
+def test_file_cache_is_shared_between_footy_objects(site, tmpdir):
+    url = page(site)
+    directory = str(tmpdir.join('pages'))
+    site.footy(cache=FileCache(directory, ttl=0))._fetch(url)
+
+    footy = site.footy(cache=FileCache(directory, ttl=0))
+    body = footy._fetch(url)
+
+    assert len(os.listdir(directory)) == 1
+    assert 'If-None-Match' in site.sent_headers[1]
+    assert body == site.pages[url]
+
+    site.calls = []
+    site.footy(cache=FileCache(directory, ttl=300))._fetch(url)
+    assert site.calls == []
+
+
+def test_corrupt_file_entry_is_ignored(site, tmpdir):
+    url = page(site)
+    cache = FileCache(str(tmpdir), ttl=300)
+    with open(cache._path(url), 'w') as cached:
+        cached.write('{not json')
+
+    assert cache.get(url) is None
+    assert site.footy(cache=cache)._fetch(url) == site.pages[url]
+    assert site.sent_headers == [{}]
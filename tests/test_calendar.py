@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# File: test_calendar.py
+
+import os
+import gzip
+
+import pytest
+
+from footylib.footylibCalendar import (fold, vevent, export_calendars,
+                                      CalendarCache)
+from conftest import standings_row, match_row
+
+TITLE = (u'Café Zürich - '
+         u'Ölçü Spor Kulübü Çok Uzun Bir İsimle Gelen Takım')
+
+
+@pytest.mark.parametrize('info', [
+    u'Kleedkamer 3, daarna één drankje in de kantine; niet vergeten',
+    u'€' * 40,
+    u'x' * 73 + u',' + u'ü' * 30,
+    u'Veld 1',
+], ids=['text', 'multibyte', 'escape', 'short'])
+def test_vevent_matches_icalendar(site, info):
+    site.competition('first', 'First division',
+                     [standings_row(1, u'Café Zürich')],
+                     [match_row('05.09.2017 20:30', TITLE, location=info,
+                                info=info)])
+    match = site.footy().competitions[0].matches[0]
+
+    assert vevent(match) == match.event.to_ical()
+
+
+def test_fold_keeps_lines_within_75_octets():
+    line = u'SUMMARY:' + u'ü' * 100 + u'a' * 100
+
+    for part in fold(line).split(b'\r\n')[:-1]:
+        assert len(part) <= 75
+        part.decode('utf-8')
+
+
+def test_export_keeps_teams_with_the_same_name_apart(site, tmpdir):
+    site.competition('first', 'First division',
+                     [standings_row(1, 'Ajax'),
+                      standings_row(2, 'Bravo'),
+                      standings_row(3, 'Ajax')],
+                     [match_row('05.09.2017 20:30', 'Ajax - Bravo'),
+                      match_row('12.09.2017 20:30', 'Bravo - Ajax')])
+    footy = site.footy()
+    directory = str(tmpdir)
+
+    paths = export_calendars(footy.competitions, directory)
+
+    team_paths = [os.path.join(directory, 'first', name)
+                  for name in ('ajax.ics', 'bravo.ics', 'ajax-.ics')]
+    assert paths == [os.path.join(directory, 'first.ics')] + team_paths
+    for path in team_paths:
+        with open(path, 'rb') as ics:
+            content = ics.read()
+        assert content.endswith(b'END:VCALENDAR\r\n')
+        assert content.count(b'BEGIN:VEVENT') == 2
+
+
+def test_competition_feed_is_kept_until_refresh(site, monkeypatch):
+    matches = [match_row('05.09.2017 20:30', 'Ajax - Bravo')]
+    site.competition('first', 'First division',
+                     [standings_row(1, 'Ajax'), standings_row(2, 'Bravo')],
+                     matches)
+    competition = site.footy(calendar_cache=CalendarCache()).competitions[0]
+    feed = competition.calendar_feed
+    digests = []
+    digest = CalendarCache.digest
+    monkeypatch.setattr(CalendarCache, 'digest', classmethod(
+        lambda cls, matches: digests.append(matches) or digest(matches)))
+
+    assert competition.calendar_feed is feed
+    assert not competition.refresh()
+    assert competition.calendar_feed is feed
+    assert digests == []
+
+    site.competition('first', 'First division',
+                     [standings_row(1, 'Ajax'), standings_row(2, 'Bravo')],
+                     [match_row('05.09.2017 20:30', 'Ajax - Bravo',
+                                location='Veld 2')])
+    assert competition.refresh()
+    assert b'LOCATION:Veld 2' in competition.calendar_feed.body
+    assert len(digests) == 1
+
+
+def test_gzipped_feed_is_reproducible(site):
+    site.competition('first', 'First division', [standings_row(1, 'Ajax')],
+                     [match_row('05.09.2017 20:30', 'Ajax - Bravo')])
+    matches = site.footy().competitions[0].matches
+
+    first = CalendarCache().feed(matches)
+    second = CalendarCache().feed(matches)
+
+    assert gzip.decompress(first.gzipped) == first.body
+    assert first.gzipped == second.gzipped
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+# File: test_cli.py
+
+import os
+import json
+import logging
+
+import pytest
+
+from footylib import Footy, Transport
+from footylib import footylibCli
+from footylib.footylibCli import main
+from conftest import standings_row, match_row
+
+MATCHES = [match_row('05.09.2017 20:30', 'Ajax - Bravo', score='2 - 1'),
+           match_row('12.09.2017 20:30', 'Bravo - Ajax')]
+
+
+@pytest.fixture
+def run(site, monkeypatch, capsys):
+    """
+    Runs the command line against the stand-in site
+
+    :return: function taking the arguments and returning the exit
+             status and what was printed
+    """
+    site.competition('first', 'First division',
+                     [standings_row(1, 'Ajax', points=3, played=1),
+                      standings_row(2, 'Bravo', played=1)], MATCHES)
+    site.competition('second', 'Second division',
+                     [standings_row(1, 'Cobras'),
+                      standings_row(2, 'Delta')], [])
+
+    class SiteFooty(Footy):
+
+        def __init__(self, **kwargs):
+            kwargs['transport'] = Transport(rate=None)
+            super(SiteFooty, self).__init__(**kwargs)
+            self._session = site
+            self._site = site.url
+
+    monkeypatch.setattr(footylibCli, 'Footy', SiteFooty)
+
+    def run(*arguments):
+        status = main(list(arguments))
+        return status, capsys.readouterr().out
+
+    return run
+
+
+def test_crawl(run):
+    assert run('crawl') == (0, '2 competitions, 4 teams, 2 matches\n')
+
+
+def test_failed_competition_is_left_out(run, site, caplog):
+    gone = site.missing('gone')
+
+    with caplog.at_level(logging.ERROR, logger='footylib'):
+        assert run('crawl') == (1, '2 competitions, 4 teams, 2 matches\n')
+
+    assert site.calls.count(gone) == 1
+    assert 'Leaving out {}'.format(gone) in caplog.text
+
+
+def test_every_command_leaves_failed_competitions_out(run, site, tmpdir):
+    gone = site.missing('gone')
+
+    assert run('search', 'ajax')[0] == 1
+    assert run('standings')[0] == 1
+    assert run('export', str(tmpdir))[0] == 1
+    assert site.calls.count(gone) == 3
+    assert sorted(os.listdir(str(tmpdir))) == ['first', 'first.ics',
+                                               'second', 'second.ics']
+
+
+def test_nothing_loaded(run, site):
+    del site.pages[site.url]
+
+    assert run('crawl') == (1, '')
+
+
+def test_standings_and_matches(run):
+    status, output = run('standings')
+    lines = output.splitlines()
+    assert status == 0
+    assert lines[0].startswith('competition,division,position,name,')
+    assert [line.split(',')[3] for line in lines[1:]] == [
+        'Ajax', 'Bravo', 'Cobras', 'Delta']
+
+    status, output = run('matches', '--format', 'jsonl')
+    records = [json.loads(line) for line in output.splitlines()]
+    assert status == 0
+    assert [(record['title'], record['home_team_goals'])
+            for record in records] == [('Ajax - Bravo', 2),
+                                       ('Bravo - Ajax', 0)]
+
+
+def test_search(run, site):
+    status, output = run('search', 'cobra', 'nobody')
+
+    assert status == 1
+    assert output == 'cobra\tCobras\tSecond division\t{}\n'.format(
+        '{}/competition/second/'.format(site.base))
+
+
+def test_export_teams(run, tmpdir):
+    directory = str(tmpdir.join('calendars'))
+
+    status, output = run('export', directory, '--team', 'ajax',
+                         '--team', 'nobody')
+
+    assert status == 1
+    assert output.splitlines() == [os.path.join(directory, 'ajax.ics')]
+    with open(os.path.join(directory, 'ajax.ics'), 'rb') as ics:
+        assert ics.read().count(b'BEGIN:VEVENT') == 2
+
+
+def test_snapshot_is_used_without_requests(run, site, tmpdir):
+    snapshot = str(tmpdir.join('footy.db'))
+    assert run('--snapshot', snapshot, 'crawl')[0] == 0
+    calls = len(site.calls)
+
+    assert run('--snapshot', snapshot, 'search', 'delta')[0] == 0
+    assert len(site.calls) == calls
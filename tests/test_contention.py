@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# File: test_contention.py
+
+"""
+One shared Footy object hammered from many threads at once
+
+The pages are served with a delay, so the threads pile up on every
+lazily loaded resource: the league page, the competitions, their teams,
+matches and the indexes.
+"""
+
+import sys
+import time
+import threading
+from collections import Counter
+
+import pytest
+
+from conftest import standings_row, match_row
+
+THREADS = 16
+DELAY = 0.02
+
+
+@pytest.fixture
+def interleaved():
+    """
+    Makes the threads switch as often as possible between the checks and
+    the assignments
+    """
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def populate(site, count=4, delay=DELAY):
+    for number in range(count):
+        url = site.competition(
+            'division-{}'.format(number), 'Division {}'.format(number),
+            [standings_row(1, 'Ajax {}'.format(number)),
+             standings_row(2, 'Bravo {}'.format(number))],
+            [match_row('05.09.2017 20:30', 'Ajax - Bravo'),
+             match_row('12.09.2017 20:30', 'Bravo - Ajax')])
+        site.delays[url] = delay
+    site.delays[site.url] = delay
+
+
+def worker(footy, barrier, errors, step):
+    try:
+        barrier.wait()
+        competitions = footy.competitions
+        competition = competitions[step % len(competitions)]
+        if step % 5 == 0:
+            _ = competition.teams
+        elif step % 5 == 1:
+            _ = competition.matches
+        elif step % 5 == 2:
+            _ = competition.division
+        elif step % 5 == 3:
+            footy.query_matches()
+        else:
+            footy.search_team('ajax')
+    except Exception as exception:
+        errors.append(repr(exception))
+
+
+@pytest.mark.parametrize('round_', range(3))
+def test_every_page_is_fetched_once(site, interleaved, round_):
+    populate(site)
+    footy = site.footy()
+    barrier = threading.Barrier(THREADS)
+    errors = []
+    pool = [threading.Thread(target=worker,
+                             args=(footy, barrier, errors, step))
+            for step in range(THREADS)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+
+    assert errors == []
+    assert set(Counter(site.calls).values()) == {1}
+    for competition in footy.competitions:
+        assert len(competition.teams) == 2
+        assert len(competition.matches) == 2
+    assert len(footy.search_team('ajax')) == len(footy.competitions)
+    assert len(footy.query_matches()) == 2 * len(footy.competitions)
+
+
+@pytest.mark.parametrize('index', ['team_index', 'match_index'])
+def test_index_is_not_built_under_the_lock_of_the_crawl(site, index):
+    populate(site, delay=0.2)
+    footy = site.footy()
+    _ = footy.competitions
+    builder = threading.Thread(target=getattr, args=(footy, index))
+    builder.start()
+    # The league page is in, the crawl of the competitions has begun
+    while len(site.calls) < 2:
+        time.sleep(0.001)
+
+    try:
+        # Refreshing or listing the competitions takes this lock
+        assert footy._lock.acquire(timeout=0.1)
+        footy._lock.release()
+    finally:
+        builder.join()
+    assert getattr(footy, index) is getattr(footy, index)
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+# File: test_imports.py
+
+import os
+import sys
+import json
+import subprocess
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                      'benchmarks', 'imports.py')
+
+
+def test_import_is_light_and_within_the_budget(tmpdir):
+    output = str(tmpdir.join('imports.json'))
+
+    status = subprocess.call([sys.executable, SCRIPT, '--repeat', '5',
+                              '--output', output])
+
+    with open(output) as results_file:
+        results = json.load(results_file)
+    assert results['heavy_modules_loaded'] == []
+    assert results['median'] <= results['budget']
+    assert status == 0
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# File: test_prefetch.py
+
+from footylib import footylib as core
+from footylib import METRICS
+from conftest import standings_row, match_row
+
+
+def populate(site):
+    for number in range(3):
+        site.competition('division-{}'.format(number),
+                         'Division {}'.format(number),
+                         [standings_row(1, 'Ajax {}'.format(number)),
+                          standings_row(2, 'Bravo {}'.format(number))],
+                         [match_row('05.09.2017 20:30', 'Ajax - Bravo'),
+                          match_row('2017-09-12 20:30', 'Bravo - Ajax'),
+                          match_row('not a date', 'Ajax - Bravo')])
+
+
+def summary(footy):
+    return [(competition.division,
+             [team.name for team in competition.teams],
+             [(match.title, match.datetime) for match in competition.matches])
+            for competition in footy.competitions]
+
+
+def test_processes_parse_like_threads_and_count_fallbacks(site,
+                                                          monkeypatch):
+    populate(site)
+    monkeypatch.setattr(core, 'DATETIME_STATS', core.Counter())
+    threaded = site.footy()
+    threaded.prefetch()
+    expected = dict(core.DATETIME_STATS)
+    assert expected == {'fallback': 6, 'failed': 3}
+
+    core.DATETIME_STATS.clear()
+    METRICS.reset()
+    METRICS.enable()
+    try:
+        footy = site.footy(processes=2)
+        footy.prefetch()
+    finally:
+        METRICS.disable()
+
+    assert summary(footy) == summary(threaded)
+    assert dict(core.DATETIME_STATS) == expected
+    assert METRICS.counter_value('footylib_kickoff_fallbacks_total') == 6
+    assert METRICS.counter_value('footylib_kickoff_failures_total') == 3
+
+
+def test_processes_keep_competitions_loaded_meanwhile(site):
+    populate(site)
+    footy = site.footy()
+    first = footy.competitions[0]
+    teams, matches = first.teams, first.matches
+    page = first._footy._fetch(first.url)
+    sections, kickoffs, _ = core._parse_page(footy._parser, page,
+                                             first.SECTIONS)
+
+    assert not first._assemble(sections, kickoffs)
+    assert first.teams is teams and first.matches is matches
+
+    calls = len(site.calls)
+    footy.prefetch(processes=2)
+
+    assert first.teams is teams and first.matches is matches
+    assert site.calls.count(first.url) == 2
+    assert len(site.calls) == calls + 2
+    assert footy.get_team('ajax 0') is teams[0]
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+# File: test_refresh.py
+
+from datetime import datetime
+
+from conftest import standings_row, match_row
+
+TEAMS = [standings_row(1, 'Ajax'),
+         standings_row(2, 'Bravo'),
+         standings_row(3, 'Cobras')]
+MATCHES = [match_row('05.09.2017 20:30', 'Ajax - Bravo'),
+           match_row('12.09.2017 20:30', 'Bravo - Cobras'),
+           match_row('19.09.2017 20:30', 'Cobras - Ajax'),
+           match_row('26.09.2017 20:30', 'Ajax - Bravo')]
+
+
+def loaded(site):
+    url = site.competition('first', 'First division', TEAMS, MATCHES)
+    footy = site.footy()
+    competition = footy.competitions[0]
+    competition._load()
+    return footy, competition, url
+
+
+def test_unchanged_page_has_no_changes(site):
+    footy, competition, _ = loaded(site)
+    teams, matches = list(competition.teams), list(competition.matches)
+
+    changes = competition.refresh()
+
+    assert not changes
+    assert footy.refresh() == []
+    assert competition.teams == teams
+    assert competition.matches == matches
+
+
+def test_first_refresh_reports_everything_as_new(site):
+    site.competition('first', 'First division', TEAMS, MATCHES)
+    competition = site.footy().competitions[0]
+
+    changes = competition.refresh()
+
+    assert [team.name for team in changes.new_teams] == [b'Ajax', b'Bravo',
+                                                         b'Cobras']
+    assert len(changes.new_matches) == 4
+
+
+def test_result_reschedule_and_other_fields(site):
+    footy, competition, url = loaded(site)
+    first, second, third, fourth = competition.matches
+    matches = [match_row('05.09.2017 20:30', 'Ajax - Bravo', score='2 - 1'),
+               match_row('13.09.2017 21:30', 'Bravo - Cobras'),
+               match_row('19.09.2017 20:30', 'Cobras - Ajax',
+                         location='Veld 2'),
+               MATCHES[3]]
+    site.competition('first', 'First division', TEAMS, matches)
+
+    changes = competition.refresh()
+
+    assert changes.competition is competition
+    assert [(match, old.score) for match, old in changes.results] == [
+        (first, '-:-')]
+    assert [(match, old.datetime) for match, old in changes.rescheduled] == [
+        (second, '12.09.2017 20:30')]
+    assert [(match, old.location)
+            for match, old in changes.updated_matches] == [(third, 'Veld 1')]
+    assert changes.new_matches == changes.removed_matches == []
+    assert changes.new_teams == changes.removed_teams == []
+    assert changes.standings == []
+    assert competition.matches == [first, second, third, fourth]
+    assert first.result == (2, 1)
+    assert second.datetime == datetime(2017, 9, 13, 21, 30)
+    assert third.location == 'Veld 2'
+
+
+def test_rematches_are_told_apart_by_order(site):
+    footy, competition, url = loaded(site)
+    first, second, third, fourth = competition.matches
+    matches = list(MATCHES)
+    matches[3] = match_row('26.09.2017 20:30', 'Ajax - Bravo', score='0 - 3')
+    site.competition('first', 'First division', TEAMS, matches)
+
+    changes = competition.refresh()
+
+    assert [match for match, _ in changes.results] == [fourth]
+    assert first.score == '-:-'
+    assert fourth.result == (0, 3)
+
+
+def test_added_and_removed_teams_and_matches(site):
+    footy, competition, url = loaded(site)
+    ajax, bravo, cobras = competition.teams
+    first, second, third, fourth = competition.matches
+    teams = [standings_row(1, 'Ajax', points=3, played=1),
+             standings_row(2, 'Bravo'),
+             standings_row(3, 'Delta')]
+    matches = [MATCHES[0],
+               MATCHES[3],
+               match_row('03.10.2017 20:30', 'Delta - Ajax')]
+    site.competition('first', 'First division', teams, matches)
+
+    changes = competition.refresh()
+
+    assert [team.name for team in changes.new_teams] == [b'Delta']
+    assert changes.removed_teams == [cobras]
+    assert [(team, old.points) for team, old in changes.standings] == [
+        (ajax, '0')]
+    assert [match.title for match in changes.new_matches] == [
+        b'Delta - Ajax']
+    assert sorted(changes.removed_matches, key=lambda match: match.title) \
+        == [second, third]
+    assert changes.results == changes.rescheduled == []
+    assert changes.updated_matches == []
+    assert competition.teams[:2] == [ajax, bravo]
+    assert ajax.points == '3'
+    assert competition._team_by_name(b'Cobras') is None
+    assert competition._team_by_name(b'Delta') is changes.new_teams[0]
+    assert competition._matches_for(b'Ajax') == [first, fourth,
+                                                  changes.new_matches[0]]
+    assert footy.get_team('Delta') is changes.new_teams[0]
+    assert footy.get_team('Cobras') is None
+
+
+def test_division_change_updates_every_team(site):
+    footy, competition, url = loaded(site)
+    site.competition('first', 'Premier division', TEAMS, MATCHES)
+
+    changes = competition.refresh()
+
+    assert [team for team, _ in changes.standings] == competition.teams
+    assert competition.division == 'Premier division'
+    assert all(team.division == 'Premier division'
+               for team in competition.teams)
+
+
+def test_sections_are_replaced_after_teams_and_matches(site):
+    footy, competition, url = loaded(site)
+    site.competition('first', 'First division', TEAMS, MATCHES[:2])
+    seen = []
+
+    class Sections(dict):
+
+        def get(self, key, default=None):
+            seen.append((len(competition.matches), competition._sections is
+                         self))
+            return dict.get(self, key, default)
+
+    parse = competition._parse
+    competition._parse = lambda page: Sections(parse(page))
+
+    competition.refresh()
+
+    assert seen and all(matches == 4 and not current
+                        for matches, current in seen)
+    assert len(competition.matches) == 2
+    assert isinstance(competition._sections, Sections)
+
+
+def test_competition_refresh_updates_the_footy_indexes(site):
+    site.competition('first', 'First division', TEAMS[:1], MATCHES[:0])
+    footy = site.footy()
+    assert footy.get_team('bravo') is None
+    assert footy.query_matches() == []
+    site.competition('first', 'First division', TEAMS, MATCHES[:1])
+
+    footy.competitions[0].refresh()
+
+    assert footy.get_team('bravo').name == b'Bravo'
+    assert [match.title for match in footy.query_matches()] == [
+        b'Ajax - Bravo']
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+# File: test_scheduler.py
+
+from datetime import datetime, timedelta
+
+from footylib import Scheduler
+from conftest import standings_row, match_row
+
+TEAMS = [standings_row(1, 'Ajax'), standings_row(2, 'Bravo')]
+START = datetime(2017, 9, 5, 12, 0)
+# Kicks off at 20:30 and ends at 21:20
+KICKOFF = '05.09.2017 20:30'
+END = datetime(2017, 9, 5, 21, 20)
+
+
+class Clock(object):
+    """
+    Fake clock, sleeping moves it forward instantly
+    """
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+def crawl(site, clock, result_at=None):
+    """
+    :param result_at: datetime the result shows up on the page
+    :return: Footy object and the list of times the competition was fetched
+    """
+    url = site.competition('first', 'First division', TEAMS,
+                           [match_row(KICKOFF, 'Ajax - Bravo')])
+    fetched = []
+    get = site.get
+
+    def timed_get(request_url, **kwargs):
+        if request_url == url:
+            fetched.append(clock())
+            if result_at is not None and clock() >= result_at:
+                site.competition('first', 'First division', TEAMS,
+                                 [match_row(KICKOFF, 'Ajax - Bravo',
+                                            score='2 - 1')])
+        return get(request_url, **kwargs)
+
+    site.get = timed_get
+    return site.footy(), fetched
+
+
+def gaps(times):
+    return [(later - earlier).total_seconds()
+            for earlier, later in zip(times, times[1:])]
+
+
+def test_polls_densely_after_the_match_until_the_result(site):
+    clock = Clock(START)
+    footy, fetched = crawl(site, clock,
+                           result_at=datetime(2017, 9, 5, 21, 45))
+    scheduler = Scheduler(footy, clock=clock, sleep=clock.sleep)
+
+    scheduler.run(until=datetime(2017, 9, 6, 6, 0))
+
+    minutes = [START + timedelta(minutes=minute) for minute in
+               (0, 6 * 60, 9 * 60 + 20, 9 * 60 + 25, 9 * 60 + 30,
+                9 * 60 + 35, 9 * 60 + 40, 9 * 60 + 45, 15 * 60 + 45)]
+    assert fetched == minutes
+    # The first refresh loads the competition, the other one the result
+    assert scheduler.stats['changes'] == 2
+    assert footy.competitions[0].matches[0].result == (2, 1)
+
+
+def test_stops_polling_for_a_result_after_the_window(site):
+    clock = Clock(START)
+    footy, fetched = crawl(site, clock)
+    scheduler = Scheduler(footy, clock=clock, sleep=clock.sleep)
+
+    scheduler.run(until=datetime(2017, 9, 6, 12, 0))
+
+    live = [time for time in fetched if END <= time <= END +
+            scheduler.result_window]
+    assert live[0] == END
+    assert live[-1] == END + scheduler.result_window - timedelta(minutes=5)
+    assert set(gaps(live)) == {300}
+    after = [time for time in fetched if time > live[-1]]
+    assert set(gaps([live[-1]] + after)) == {6 * 3600}
+    assert [time for time in fetched if time < END] == [
+        START, START + timedelta(hours=6)]
+
+
+def test_budget_spaces_out_the_polls(site):
+    clock = Clock(END)
+    footy, fetched = crawl(site, clock)
+    scheduler = Scheduler(footy, budget=3, period=3600, clock=clock,
+                          sleep=clock.sleep)
+
+    scheduler.run(until=END + timedelta(hours=2))
+
+    # Three polls in a burst, then one every 20 minutes once the bucket
+    # is empty
+    assert gaps(fetched)[:3] == [300, 300, 600]
+    assert set(gaps(fetched)[3:]) == {1200}
+    assert scheduler.stats['throttled'] == len(fetched) - 3
+
+
+def test_stop_ends_the_loop(site):
+    clock = Clock(START)
+    footy, fetched = crawl(site, clock)
+    scheduler = Scheduler(footy, clock=clock, sleep=clock.sleep,
+                          on_changes=lambda changes: None)
+    original = clock.sleep
+
+    def sleep(seconds):
+        original(seconds)
+        if len(fetched) == 2:
+            scheduler.stop()
+
+    scheduler._sleep = sleep
+    scheduler.run()
+
+    assert len(fetched) == 2
+
+
+def test_failing_page_does_not_end_the_loop(site):
+    clock = Clock(START)
+    footy, fetched = crawl(site, clock,
+                           result_at=datetime(2017, 9, 5, 21, 45))
+    gone = site.missing('gone')
+    scheduler = Scheduler(footy, clock=clock, sleep=clock.sleep)
+
+    scheduler.run(until=datetime(2017, 9, 6, 6, 0))
+
+    # Every six hours, like any competition without matches
+    assert site.calls.count(gone) == scheduler.stats['failures'] == 3
+    assert len(fetched) == 9
+    assert footy.competitions[0].matches[0].result == (2, 1)
+
+
+def test_failing_league_page_is_retried(site):
+    clock = Clock(START)
+    footy, fetched = crawl(site, clock)
+    del site.pages[site.url]
+    scheduler = Scheduler(footy, clock=clock, sleep=clock.sleep)
+
+    assert scheduler.run_once() == scheduler.live_interval.total_seconds()
+    assert scheduler.stats['failures'] == 1
+    assert fetched == []
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# File: test_snapshot.py
+
+import os
+from datetime import datetime
+
+import pytest
+
+import footylib
+from footylib import ErrorFetchingPage
+from conftest import standings_row, match_row
+
+
+def populate(site):
+    site.competition('first', 'First division',
+                     [standings_row(1, u'Café Zürich', points=3),
+                      standings_row(2, 'Bravo')],
+                     [match_row('05.09.2017 20:30', u'Café Zürich - Bravo',
+                                score='2 - 1'),
+                      match_row('12.09.2017 20:30', u'Bravo - Café Zürich'),
+                      match_row('not a date', u'Bravo - Café Zürich')])
+    site.competition('second', 'Second division',
+                     [standings_row(1, 'Delta')], [])
+
+
+def summary(footy):
+    return [(competition.url,
+             competition.division,
+             [(team.name, team.points, team.division)
+              for team in competition.teams],
+             [(match.title, match.datetime, match.score, match.result)
+              for match in competition.matches])
+            for competition in footy.competitions]
+
+
+def test_round_trip(site, tmpdir):
+    populate(site)
+    path = str(tmpdir.join('footy.db'))
+    footy = site.footy()
+    footy.save_snapshot(path)
+
+    calls = len(site.calls)
+    loaded = footylib.Footy.load_snapshot(path)
+
+    assert summary(loaded) == summary(footy)
+    assert len(site.calls) == calls
+    match = loaded.competitions[0].matches[0]
+    assert match.datetime == datetime(2017, 9, 5, 20, 30)
+    assert match.home_team.name == u'Café Zürich'.encode('utf-8')
+    assert loaded.get_team('cafe zurich') is match.home_team
+    assert os.listdir(str(tmpdir)) == ['footy.db']
+
+
+def test_failed_save_keeps_the_previous_snapshot(site, tmpdir):
+    populate(site)
+    path = str(tmpdir.join('footy.db'))
+    site.footy().save_snapshot(path)
+    site.missing('gone')
+
+    with pytest.raises(ErrorFetchingPage):
+        site.footy().save_snapshot(path)
+
+    loaded = footylib.Footy.load_snapshot(path)
+    assert [competition.url for competition in loaded.competitions] == [
+        site.base + '/competition/first/', site.base + '/competition/second/']
+    assert os.listdir(str(tmpdir)) == ['footy.db']
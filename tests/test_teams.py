@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+# File: test_teams.py
+
+from conftest import standings_row, match_row
+
+
+def test_team_1_does_not_match_team_10(site):
+    site.competition('first', 'First division',
+                     [standings_row(1, 'Team 1'), standings_row(2, 'Team 10'),
+                      standings_row(3, 'Team 11')],
+                     [match_row('05.09.2017 20:30', 'Team 10 - Team 11'),
+                      match_row('12.09.2017 20:30', 'Team 1 - Team 10'),
+                      match_row('19.09.2017 20:30', 'Team 11 - Team 1')])
+    footy = site.footy()
+    team_1, team_10, team_11 = footy.competitions[0].teams
+    first, second, third = footy.competitions[0].matches
+
+    assert team_1.matches == [second, third]
+    assert team_10.matches == [first, second]
+    assert team_11.matches == [first, third]
+    assert first.home_team is team_10
+    assert first.visiting_team is team_11
+    assert second.home_team is team_1
+    assert second.visiting_team is team_10
+    assert third.home_team is team_11
+    assert third.visiting_team is team_1
+    assert footy.get_team('Team 1') is team_1
+    assert footy.get_team('team 10') is team_10
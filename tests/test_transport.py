@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+# File: test_transport.py
+
+import pytest
+from requests.exceptions import ConnectionError
+
+from footylib import Transport, ErrorFetchingPage
+from conftest import Response
+
+URL = 'https://www.footy.eu/schemas-standen/'
+
+
+class Session(object):
+    """
+    Answers every request with the next of the given answers, an
+    exception instance is raised instead
+    """
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append((url, headers, timeout))
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+def transport(session, **kwargs):
+    sleeps = []
+    kwargs.setdefault('backoff', 1)
+    result = Transport(sleep=sleeps.append, **kwargs)
+    result.session = session
+    return result, sleeps
+
+
+def test_retries_503_until_200():
+    session = Session(Response('', 503), Response('', 503), Response('ok'))
+    client, sleeps = transport(session, retries=3)
+
+    response = client.get(URL, headers={'If-None-Match': '"a"'})
+
+    assert response.text == 'ok'
+    assert len(session.requests) == 3
+    assert session.requests[0] == (URL, {'If-None-Match': '"a"'}, (5, 30))
+    assert len(sleeps) == 2
+    # Jittered exponential backoff, 1s and then 2s at most
+    assert 0 <= sleeps[0] <= 1 and 0 <= sleeps[1] <= 2
+    assert client.stats['requests'] == 3
+    assert client.stats['retries'] == 2
+
+
+def test_retry_after_is_honoured_up_to_backoff_max():
+    session = Session(Response('', 429, {'Retry-After': '7'}),
+                      Response('', 503, {'Retry-After': '120'}),
+                      Response('ok'))
+    client, sleeps = transport(session, backoff_max=30)
+
+    client.get(URL)
+
+    assert sleeps[0] >= 7
+    assert sleeps[1] == 30
+
+
+def test_connection_errors_are_retried():
+    session = Session(ConnectionError('reset'), Response('ok'))
+    client, sleeps = transport(session)
+
+    assert client.get(URL).text == 'ok'
+    assert len(sleeps) == 1
+
+
+def test_exhausted_retries_raise():
+    session = Session(*[Response('', 503)] * 3)
+    client, sleeps = transport(session, retries=2)
+
+    with pytest.raises(ErrorFetchingPage) as error:
+        client.get(URL)
+
+    assert error.value.url == URL
+    assert error.value.reason == 503
+    assert len(session.requests) == 3
+    assert len(sleeps) == 2
+    assert client.stats['failures'] == 1
+
+
+def test_client_errors_are_not_retried():
+    session = Session(Response('', 404))
+    client, sleeps = transport(session)
+
+    with pytest.raises(ErrorFetchingPage):
+        client.get(URL)
+
+    assert len(session.requests) == 1
+    assert sleeps == []
+
+
+def test_not_throttled_unless_a_rate_is_given():
+    session = Session(*[Response('ok')] * 20)
+    client, sleeps = transport(session)
+
+    for _ in range(20):
+        client.get(URL)
+
+    assert sleeps == []
+    assert client.stats['throttled'] == 0
+
+
+def test_rate_limits_per_host():
+    session = Session(*[Response('ok')] * 4)
+    client, sleeps = transport(session, rate=1, burst=2)
+
+    for _ in range(4):
+        client.get(URL)
+
+    assert len(sleeps) == 2
+    assert sleeps[0] == pytest.approx(1, abs=0.1)
+    assert sleeps[1] == pytest.approx(2, abs=0.1)
+    assert client.stats['throttled'] == 2